@@ -2,11 +2,11 @@ import sys
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, QLabel, QTextEdit, QStackedWidget
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QFontDatabase
 from summarizer import summarize_text
 from paraphraser import Paraphraser
-from translator import translate_english_to_hindi, translate_hindi_to_english
+from translator import stream_english_to_hindi, translate_english_to_hindi, translate_hindi_to_english
 
 class HomePage(QWidget):
     def __init__(self, navigate_to_paraphraser, navigate_to_summarizer,navigate_to_translator, custom_font):
@@ -84,8 +84,33 @@ class HomePage(QWidget):
         self.setLayout(layout)
 
 
+class StreamWorker(QThread):
+    # Runs a streaming process function off the GUI thread and emits every
+    # piece of output as it arrives; requestInterruption() stops the stream
+    chunk = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, stream_function, input_text):
+        super().__init__()
+        self.stream_function = stream_function
+        self.input_text = input_text
+
+    def run(self):
+        stream = self.stream_function(self.input_text)
+        try:
+            for piece in stream:
+                if self.isInterruptionRequested():
+                    break
+                self.chunk.emit(piece)
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            # Closing the generator also stops a running generate
+            stream.close()
+
+
 class TextProcessorPage(QWidget):
-    def __init__(self, title, process_function, custom_font, navigate_back):
+    def __init__(self, title, process_function, custom_font, navigate_back, stream_function=None):
         super().__init__()
 
         # Layout for the processor page
@@ -123,6 +148,7 @@ class TextProcessorPage(QWidget):
         """)
         process_button.clicked.connect(self.process_text)
         layout.addWidget(process_button)
+        self.process_button = process_button
 
         # Output text field
         self.output_text = QTextEdit(self)
@@ -151,8 +177,11 @@ class TextProcessorPage(QWidget):
         back_button.clicked.connect(navigate_back)
         layout.addWidget(back_button)
 
-        # Save the process function
+        # Save the process function; stream_function, if given, yields the
+        # output piece by piece and is shown as it arrives
         self.process_function = process_function
+        self.stream_function = stream_function
+        self.worker = None
 
         self.setLayout(layout)
 
@@ -162,10 +191,26 @@ class TextProcessorPage(QWidget):
             self.output_text.setText("Please enter text to process.")
             return
 
+        if self.stream_function is not None:
+            self.output_text.clear()
+            self.process_button.setEnabled(False)
+            self.worker = StreamWorker(self.stream_function, input_text)
+            self.worker.chunk.connect(self.append_output)
+            self.worker.failed.connect(self.output_text.setText)
+            self.worker.finished.connect(lambda: self.process_button.setEnabled(True))
+            self.worker.start()
+            return
+
         # Process the input text
         result = self.process_function(input_text)
         self.output_text.setText(result)
 
+    def append_output(self, piece):
+        cursor = self.output_text.textCursor()
+        cursor.movePosition(cursor.End)
+        cursor.insertText(piece)
+        self.output_text.setTextCursor(cursor)
+
 
 class MainApp(QMainWindow):
     def __init__(self):
@@ -191,13 +236,13 @@ class MainApp(QMainWindow):
         # Create the pages
         self.home_page = HomePage(self.show_paraphraser_page, self.show_summarizer_page, self.show_translator_page, custom_font)
         self.paraphraser_page = TextProcessorPage(
-            "Paraphraser", self.paraphrase_text, custom_font, self.show_home_page
+            "Paraphraser", self.paraphrase_text, custom_font, self.show_home_page, self.stream_paraphrase
         )
         self.summarizer_page = TextProcessorPage(
             "Summarizer", self.summarize_text, custom_font, self.show_home_page
         )
         self.translator_page = TextProcessorPage(
-            "Translator", self.translator, custom_font, self.show_home_page
+            "Translator", self.translator, custom_font, self.show_home_page, self.stream_translation
         )
 
         # Add pages to the stack
@@ -211,6 +256,14 @@ class MainApp(QMainWindow):
         # Paraphraser instance
         self.paraphraser = Paraphraser()
 
+    def closeEvent(self, event):
+        # Stop running streams before their QThreads are destroyed
+        for page in (self.paraphraser_page, self.summarizer_page, self.translator_page):
+            if page.worker is not None and page.worker.isRunning():
+                page.worker.requestInterruption()
+                page.worker.wait()
+        super().closeEvent(event)
+
     def show_home_page(self):
         self.stack.setCurrentWidget(self.home_page)
 
@@ -224,12 +277,23 @@ class MainApp(QMainWindow):
 
     def paraphrase_text(self, text):
         return self.paraphraser.paraphrase_text(text)
+
+    def stream_paraphrase(self, text):
+        return self.paraphraser.stream_text(text)
  
     def summarize_text(self, text):
-        return summarize_text(text)
+        try:
+            return summarize_text(text)
+        except LookupError as e:
+            # WordNet is not installed; show the install hint instead of
+            # letting the exception abort the app
+            return str(e)
     def translator(self, text):
         return translate_english_to_hindi(text)
 
+    def stream_translation(self, text):
+        return stream_english_to_hindi(text)
+
 def main():
     app = QApplication(sys.argv)
     main_window = MainApp()
@@ -258,7 +258,12 @@ class MainApp(QMainWindow):
         return self.paraphraser.paraphrase_text(text)
  
     def summarize_text(self, text):
-        return summarize_text(text)
+        try:
+            return summarize_text(text)
+        except LookupError as e:
+            # WordNet is not installed; show the install hint instead of
+            # letting the exception abort the app
+            return str(e)
     def translator(self, text):
         return translate_english_to_hindi(text)
     def translator2(self, text):
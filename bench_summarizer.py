@@ -0,0 +1,161 @@
+# bench_summarizer.py
+#
+# Times each stage of the summarizer on synthetic corpora built from Test.txt
+# and checks that summarize_text selects the same sentences as the reference
+# dict-of-dicts implementation. Results are printed (or written) as JSON.
+#
+#   python bench_summarizer.py --scales 1 10 100 1000 --output bench.json
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+import summarizer
+
+TEST_TEXT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Test.txt")
+
+
+# Builds a corpus of `scale` copies of Test.txt, each with its sentences in a
+# different (seeded) order so that larger corpora are not one text repeated.
+def synthetic_corpus(scale, seed=0):
+    with open(TEST_TEXT, encoding="utf-8") as f:
+        sentences = re.split(r"(?<=[.!?])\s+", f.read().strip())
+
+    rng = random.Random(seed)
+    copies = []
+    for _ in range(scale):
+        copies.append(" ".join(rng.sample(sentences, len(sentences))))
+    return " ".join(copies)
+
+
+# Parses text even if it is longer than the pipeline's max_length. The
+# pipeline is shared with summarizer, so the old limit is restored afterwards.
+def parse(nlp, text):
+    previous = nlp.max_length
+    nlp.max_length = max(previous, len(text) + 1)
+    try:
+        return nlp(text)
+    finally:
+        nlp.max_length = previous
+
+
+# Runs the summarizer pipeline stage by stage. Returns the summary and the
+# wall time of every stage.
+def run_stages(text, slim=False):
+    nlp = summarizer.get_nlp(slim)
+    stages = {}
+
+    start = time.perf_counter()
+    doc = parse(nlp, text)
+    sentences = list(doc.sents)
+    stages["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matrix, _ = summarizer.term_matrix(sentences)
+    stages["frequency_matrix"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = summarizer.sentence_scores(matrix)
+    stages["tf_idf_scoring"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    selected = summarizer.select_sentences(sentences, scores)
+    stages["selection"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    summary = "".join(" " + sentences[i].text for i in selected)
+    stages["summary_build"] = time.perf_counter() - start
+
+    return summary, stages, len(sentences)
+
+
+# Peak traced allocation of every stage, measured in a separate run because
+# tracemalloc slows the code it traces.
+def stage_memory(text, slim=False):
+    tracemalloc.start()
+    try:
+        peaks = {}
+        nlp = summarizer.get_nlp(slim)
+
+        tracemalloc.reset_peak()
+        sentences = list(parse(nlp, text).sents)
+        peaks["parse"] = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        matrix, _ = summarizer.term_matrix(sentences)
+        peaks["frequency_matrix"] = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        scores = summarizer.sentence_scores(matrix)
+        peaks["tf_idf_scoring"] = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        selected = summarizer.select_sentences(sentences, scores)
+        peaks["selection"] = tracemalloc.get_traced_memory()[1]
+
+        tracemalloc.reset_peak()
+        "".join(" " + sentences[i].text for i in selected)
+        peaks["summary_build"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def run_benchmark(scales, slim=False, check_reference=True, seed=0):
+    results = []
+    for scale in scales:
+        text = synthetic_corpus(scale, seed)
+        summary, stages, num_sentences = run_stages(text, slim)
+        total = sum(stages.values())
+
+        result = {
+            "scale": scale,
+            "chars": len(text),
+            "sentences": num_sentences,
+            "seconds": stages,
+            "total_seconds": total,
+            "sentences_per_second": num_sentences / total if total else None,
+            "chars_per_second": len(text) / total if total else None,
+            "peak_bytes": stage_memory(text, slim),
+        }
+
+        # The reference always uses the full pipeline, so only compare then
+        if check_reference and not slim:
+            start = time.perf_counter()
+            reference = summarizer.summarize_text_reference(text)
+            result["reference_seconds"] = time.perf_counter() - start
+            result["matches_reference"] = summary == reference
+
+        results.append(result)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarizer micro-benchmark")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--slim", action="store_true", help="use the tokenizer + sentencizer pipeline")
+    parser.add_argument("--no-reference", action="store_true", help="skip the reference equivalence check")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.scales, args.slim, not args.no_reference, args.seed)
+    report = json.dumps({"model": summarizer.model_version(args.slim), "results": results}, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+
+    # Non-zero exit if any scale diverged from the reference
+    return 0 if all(r.get("matches_reference", True) for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# hindencorp.py
+
+import hashlib
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Columns of hindencorp05.plaintext, tab-separated, one sentence pair per line
+FIELDS = ("source", "alignment_type", "alignment_quality", "en", "hi")
+
+# Default deterministic split of the corpus
+SPLITS = {"train": 0.98, "valid": 0.01, "test": 0.01}
+
+
+def pair_id(en, hi):
+    # Stable id of a sentence pair; duplicate pairs share it and therefore
+    # always land in the same split
+    return hashlib.sha1(f"{en}\t{hi}".encode("utf-8")).hexdigest()
+
+
+def split_of(record_id, splits=SPLITS):
+    # Name of the split a record id falls into: the first 8 bytes of the id
+    # are read as a fraction in [0, 1) and matched against the cumulative
+    # split shares
+    position = int(record_id[:16], 16) / 2 ** 64
+    total = 0.0
+    for name, share in splits.items():
+        total += share
+        if position < total:
+            return name
+    return name
+
+
+def parse_lines(first_line_number, lines, splits=SPLITS):
+    # Parse a chunk of lines into records, or (line number, field count) for
+    # lines without the expected number of fields
+    parsed = []
+    for line_number, line in enumerate(lines, first_line_number):
+        fields = line.rstrip("\r\n").split("\t")
+        if len(fields) != len(FIELDS):
+            parsed.append((line_number, len(fields)))
+            continue
+        record = dict(zip(FIELDS, fields))
+        record["id"] = pair_id(record["en"], record["hi"])
+        record["split"] = split_of(record["id"], splits)
+        parsed.append(record)
+    return parsed
+
+
+def _tensorflow():
+    # tensorflow is only needed for tf_dataset
+    try:
+        import tensorflow as tf
+    except ImportError as e:
+        raise ImportError("HindEnCorp.tf_dataset needs tensorflow: pip install tensorflow") from e
+    return tf
+
+
+# Lazy reader of hindencorp05.plaintext.
+#
+# Lines are read in chunks of chunk_lines and parsed by workers processes (in
+# this process with workers=1); at most two chunks per worker are in flight, so
+# memory use does not grow with the corpus. Records come back in file order as
+# dicts with the FIELDS columns, a pair id and the name of their split. Lines
+# with the wrong number of fields raise ValueError with strict=True and are
+# skipped otherwise. lines_read and invalid_lines count the current (or last)
+# pass over the file; every pass, e.g. every tf.data epoch, starts them at zero.
+class HindEnCorp:
+    def __init__(self, path, workers=None, chunk_lines=10000, strict=False, splits=SPLITS):
+        self.path = path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_lines = chunk_lines
+        self.strict = strict
+        self.splits = splits
+        self.lines_read = 0
+        self.invalid_lines = 0
+
+    def _chunks(self):
+        with open(self.path, encoding="utf-8") as f:
+            line_number = 1
+            while True:
+                lines = list(itertools.islice(f, self.chunk_lines))
+                if not lines:
+                    return
+                yield line_number, lines
+                line_number += len(lines)
+
+    def _parsed_chunks(self):
+        if self.workers == 1:
+            for line_number, lines in self._chunks():
+                yield parse_lines(line_number, lines, self.splits)
+            return
+
+        with ProcessPoolExecutor(self.workers) as pool:
+            pending = deque()
+            for line_number, lines in self._chunks():
+                pending.append(pool.submit(parse_lines, line_number, lines, self.splits))
+                if len(pending) >= 2 * self.workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def records(self, split=None):
+        # Records of one split ("train", "valid", "test") or of all of them
+        self.lines_read = 0
+        self.invalid_lines = 0
+        for chunk in self._parsed_chunks():
+            for record in chunk:
+                self.lines_read += 1
+                if isinstance(record, tuple):
+                    line_number, field_count = record
+                    if self.strict:
+                        raise ValueError(
+                            f"{self.path}:{line_number}: expected {len(FIELDS)} fields, found {field_count}"
+                        )
+                    self.invalid_lines += 1
+                    continue
+                if split is None or record["split"] == split:
+                    yield record
+
+    def pairs(self, direction="en-hi", split=None):
+        # (source, target) sentence pairs for a translation direction
+        source, target = direction.split("-")
+        for record in self.records(split):
+            yield record[source], record[target]
+
+    def tf_dataset(self, split="train", direction="en-hi"):
+        # tf.data.Dataset of (source, target) string pairs, streamed from the
+        # file every time it is iterated
+        tf = _tensorflow()
+        return tf.data.Dataset.from_generator(
+            lambda: self.pairs(direction, split),
+            output_signature=(tf.TensorSpec(shape=(), dtype=tf.string), tf.TensorSpec(shape=(), dtype=tf.string)),
+        )
@@ -0,0 +1,93 @@
+# idf_index.py
+
+import json
+import os
+
+import numpy as np
+
+from summarizer import get_nlp, term_matrix
+
+
+# On-disk document-frequency index for scoring summaries against a corpus
+# instead of the sentences of a single document.
+#
+# The index directory holds three files:
+#   terms.txt  one term per line, the line number is the term id
+#   df.bin     int64 document frequency per term id, memory-mapped on load
+#   meta.json  number of documents added so far
+#
+# Adding documents only appends new terms to terms.txt and df.bin and
+# increments the counts of known terms in place; nothing is rebuilt.
+class IdfIndex:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        self.terms = {}
+        terms_path = os.path.join(path, "terms.txt")
+        if os.path.exists(terms_path):
+            with open(terms_path, encoding="utf-8") as f:
+                for term_id, line in enumerate(f):
+                    self.terms[line.rstrip("\n")] = term_id
+
+        self.num_documents = 0
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.num_documents = json.load(f)["num_documents"]
+
+        self._map_df()
+
+    def _map_df(self):
+        df_path = os.path.join(self.path, "df.bin")
+        if not os.path.exists(df_path):
+            open(df_path, "wb").close()
+
+        # np.memmap cannot map an empty file
+        if len(self.terms) == 0:
+            self.df = np.zeros(0, dtype=np.int64)
+        else:
+            self.df = np.memmap(df_path, dtype=np.int64, mode="r+", shape=(len(self.terms),))
+
+    # IDF(t) = log10((documents + 1) / (documents containing t + 1)), smoothed
+    # so that terms missing from the index get the highest weight instead of
+    # dividing by zero.
+    def idf(self, terms):
+        df = np.array([self.df[self.terms[t]] if t in self.terms else 0 for t in terms], dtype=np.float64)
+        return np.log10((self.num_documents + 1) / (df + 1))
+
+    # Parses texts with spaCy and counts every distinct term once per text.
+    def add_documents(self, texts, batch_size=64, slim=True, spacy_lemmas=False):
+        counts = {}
+        num_documents = 0
+        for doc in get_nlp(slim).pipe(texts, batch_size=batch_size):
+            _, vocab = term_matrix(list(doc.sents), spacy_lemmas)
+            for term in vocab:
+                counts[term] = counts.get(term, 0) + 1
+            num_documents += 1
+
+        self.add_counts(counts, num_documents)
+
+    # Merges precomputed document frequencies ({term: documents containing it})
+    # for num_documents new documents into the index.
+    def add_counts(self, counts, num_documents):
+        new_terms = [term for term in counts if term not in self.terms]
+        if new_terms:
+            with open(os.path.join(self.path, "terms.txt"), "a", encoding="utf-8") as f:
+                f.write("".join(term + "\n" for term in new_terms))
+            with open(os.path.join(self.path, "df.bin"), "ab") as f:
+                f.write(np.zeros(len(new_terms), dtype=np.int64).tobytes())
+            for term in new_terms:
+                self.terms[term] = len(self.terms)
+            self._map_df()
+
+        if counts:
+            ids = np.array([self.terms[term] for term in counts], dtype=np.int64)
+            self.df[ids] += np.array(list(counts.values()), dtype=np.int64)
+            self.df.flush()
+
+        self.num_documents += num_documents
+        meta_path = os.path.join(self.path, "meta.json")
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"num_documents": self.num_documents}, f)
+        os.replace(meta_path + ".tmp", meta_path)
@@ -1,2 +1,2 @@
 from .paraphrase import Paraphraser
-
+from .pool import ParaphrasePool, ShardError
@@ -0,0 +1,82 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class ParaphraseCache:
+    # Sentence-level cache of paraphrases with an in-memory LRU tier and an
+    # optional SQLite tier at path that survives restarts. Entries are keyed by
+    # model name, decoding settings and the whitespace-normalized sentence.
+    # One cache can be shared between threads (e.g. a GUI streaming worker and
+    # the main thread); a lock guards both tiers.
+    def __init__(self, max_entries=4096, path=None):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        self.conn = None
+        if path is not None:
+            self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS paraphrases (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self.conn.commit()
+
+    @staticmethod
+    def key(model_name, settings, sentence):
+        payload = json.dumps([model_name, settings, " ".join(sentence.split())], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self.lock:
+            return self._get(key)
+
+    def _get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.memory_hits += 1
+            return self.entries[key]
+
+        if self.conn is not None:
+            row = self.conn.execute("SELECT value FROM paraphrases WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.disk_hits += 1
+                value = json.loads(row[0])
+                self._remember(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        with self.lock:
+            self._remember(key, value)
+            if self.conn is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO paraphrases (key, value) VALUES (?, ?)", (key, json.dumps(value))
+                )
+                self.conn.commit()
+
+    def _remember(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
@@ -0,0 +1,83 @@
+import math
+
+# Named generate() settings. full_beam is the original 10-beam search; the
+# temperature it used to pass had no effect without sampling and is dropped.
+PRESETS = {
+    "greedy": {"num_beams": 1, "do_sample": False},
+    "small_beam": {"num_beams": 4, "do_sample": False},
+    "full_beam": {"num_beams": 10, "do_sample": False},
+    "sampling": {"num_beams": 1, "do_sample": True, "top_p": 0.95, "temperature": 1.5},
+}
+
+# Beam widths the adaptive mode chooses from, widest first
+ADAPTIVE_BEAM_WIDTHS = (10, 8, 4, 2, 1)
+# Adaptive mode caps new tokens at ratio * input tokens + slack
+ADAPTIVE_LENGTH_RATIO = 1.5
+ADAPTIVE_LENGTH_SLACK = 8
+
+
+def generation_kwargs(preset, num_return_sequences, max_length):
+    # Turn a preset name (or a dict of generate arguments) into generate kwargs
+    if isinstance(preset, str):
+        if preset not in PRESETS:
+            raise ValueError(f"Unknown decoding preset {preset!r}, expected one of {sorted(PRESETS)} or 'adaptive'")
+        settings = dict(PRESETS[preset])
+    else:
+        settings = dict(preset)
+
+    # Beam search can only return as many sequences as it has beams
+    if not settings.get("do_sample"):
+        settings["num_beams"] = max(settings.get("num_beams", 1), num_return_sequences)
+    if "max_new_tokens" not in settings:
+        settings.setdefault("max_length", max_length)
+    return settings
+
+
+def adaptive_max_new_tokens(input_length, max_length):
+    return min(max_length, math.ceil(input_length * ADAPTIVE_LENGTH_RATIO) + ADAPTIVE_LENGTH_SLACK)
+
+
+def estimate_step_cost(step_costs, num_beams):
+    # Seconds per generated token per input sequence at num_beams. Widths that
+    # were never measured are extrapolated linearly from the cheapest measured
+    # cost per beam
+    if num_beams in step_costs:
+        return step_costs[num_beams]
+    if not step_costs:
+        return None
+    return min(cost / beams for beams, cost in step_costs.items()) * num_beams
+
+
+def choose_beam_width(step_costs, generated_tokens, latency_budget):
+    # Widest beam whose estimated latency for generated_tokens output tokens
+    # fits latency_budget seconds. Without any measurements yet, start greedy
+    for num_beams in ADAPTIVE_BEAM_WIDTHS:
+        cost = estimate_step_cost(step_costs, num_beams)
+        if cost is None:
+            break
+        if cost * generated_tokens <= latency_budget:
+            return num_beams
+    return 1
+
+
+def unigram_f1(candidate, reference):
+    # Bag-of-words F1 between two strings, used as a cheap quality proxy
+    candidate_words = candidate.lower().split()
+    reference_words = reference.lower().split()
+    if not candidate_words or not reference_words:
+        return float(candidate_words == reference_words)
+
+    remaining = {}
+    for word in reference_words:
+        remaining[word] = remaining.get(word, 0) + 1
+    overlap = 0
+    for word in candidate_words:
+        if remaining.get(word, 0) > 0:
+            remaining[word] -= 1
+            overlap += 1
+    if overlap == 0:
+        return 0.0
+
+    precision = overlap / len(candidate_words)
+    recall = overlap / len(reference_words)
+    return 2 * precision * recall / (precision + recall)
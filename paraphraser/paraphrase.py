@@ -1,27 +1,208 @@
+
+import time
+
 # from utils.tokenizer import initialize_model
-from utils import initialize_model
+from utils import initialize_model, model_id
+from utils.batching import padding_stats, schedule_batches, split_long_sentence
+from utils.execution import PROFILES
+from utils.streaming import stream_generate
+from .decoding import PRESETS, adaptive_max_new_tokens, choose_beam_width, generation_kwargs, unigram_f1
 
 
 class Paraphraser:
-    def __init__(self):
-        # Initialize model, tokenizer, and device (GPU or CPU)
-        self.tokenizer, self.model, self.device = initialize_model()
-
-    def get_response(self, input_text, num_return_sequences=1):
-        # Tokenize and generate paraphrased response
-        batch = self.tokenizer.prepare_seq2seq_batch(
-            [input_text], truncation=True, padding="longest", max_length=60, return_tensors="pt"
+    def __init__(
+        self, batch_size=16, token_budget=1024, max_length=60, preset="full_beam", cache=None, quantized=None,
+        backend=None, profile=None,
+    ):
+        # Initialize model, tokenizer, and device (GPU or CPU); quantized=True
+        # uses the int8 CPU model and backend="onnx" ONNX Runtime
+        self.tokenizer, self.model, self.device = initialize_model(quantized, backend)
+        # Pretrained id plus variant, part of the paraphrase cache key
+        self.model_id = model_id("paraphrase", quantized, backend)
+        # At most batch_size sentences and token_budget padded input tokens are
+        # sent through generate at once
+        self.batch_size = batch_size
+        self.token_budget = token_budget
+        # Longer sentences are split at clause boundaries instead of truncated
+        self.max_length = max_length
+        # Padding statistics of the batches of the last get_responses call
+        self.batch_stats = []
+        # Default decoding preset, see paraphraser.decoding.PRESETS
+        self.preset = preset
+        # Measured seconds per generated token per input sentence, by beam width
+        self.step_costs = {}
+        # Filled by measure_presets: latency and quality of every preset
+        self.preset_report = {}
+        # Optional ParaphraseCache; repeated sentences then skip generation
+        self.cache = cache
+        # ExecutionProfile for generate calls; None uses PROFILES["paraphrase"]
+        self.profile = profile
+
+    def get_response(self, input_text, num_return_sequences=1, preset=None, latency_budget=None):
+        return self.get_responses([input_text], num_return_sequences, preset, latency_budget)[0]
+
+    def get_responses(self, sentences, num_return_sequences=1, preset=None, latency_budget=None):
+        # Paraphrase sentences in length-bucketed micro-batches; returns one list
+        # of num_return_sequences paraphrases per input sentence, in input order.
+        # preset is a name from PRESETS, a dict of generate arguments or
+        # "adaptive", which caps new tokens relative to the input length and
+        # uses the widest beam expected to finish within latency_budget seconds
+        if self.cache is None or not self._cacheable(preset):
+            return self._paraphrase(sentences, num_return_sequences, preset, latency_budget)
+
+        settings = generation_kwargs(preset or self.preset, num_return_sequences, self.max_length)
+        keys = [self.cache.key(self.model_id, settings, sentence) for sentence in sentences]
+        responses = [self.cache.get(key) for key in keys]
+
+        # Generate each missing sentence once, even if it repeats in the input
+        missing = {}
+        for i, response in enumerate(responses):
+            if response is None:
+                missing.setdefault(keys[i], sentences[i])
+        if missing:
+            generated = self._paraphrase(list(missing.values()), num_return_sequences, preset, latency_budget)
+            for key, response in zip(missing, generated):
+                self.cache.put(key, response)
+                missing[key] = response
+            responses = [missing[key] if response is None else response for key, response in zip(keys, responses)]
+
+        return responses
+
+    def _cacheable(self, preset):
+        # Sampled and adaptive outputs change from call to call
+        preset = preset or self.preset
+        if preset == "adaptive":
+            return False
+        if isinstance(preset, str):
+            return not PRESETS.get(preset, {}).get("do_sample")
+        return not preset.get("do_sample")
+
+    def _paraphrase(self, sentences, num_return_sequences, preset, latency_budget):
+        if not sentences:
+            self.batch_stats = []
+            return []
+
+        segments = []
+        owners = []
+        for i, sentence in enumerate(sentences):
+            for piece in split_long_sentence(self.tokenizer, sentence, self.max_length):
+                segments.append(piece)
+                owners.append(i)
+
+        lengths = [len(ids) for ids in self.tokenizer(segments, truncation=False)["input_ids"]]
+        batches = schedule_batches(lengths, self.token_budget, self.batch_size)
+        self.batch_stats = padding_stats(lengths, batches)
+
+        preset = preset or self.preset
+        adaptive = preset == "adaptive"
+        if adaptive:
+            if latency_budget is None:
+                raise ValueError("The adaptive preset needs a latency_budget in seconds")
+            generated_tokens = sum(adaptive_max_new_tokens(length, self.max_length) for length in lengths)
+            preset = {"num_beams": choose_beam_width(self.step_costs, generated_tokens, latency_budget)}
+
+        outputs = [None] * len(segments)
+        for batch in batches:
+            settings = generation_kwargs(preset, num_return_sequences, self.max_length)
+            if adaptive:
+                settings["max_new_tokens"] = adaptive_max_new_tokens(max(lengths[i] for i in batch), self.max_length)
+                del settings["max_length"]
+            generated = self._generate([segments[i] for i in batch], num_return_sequences, settings)
+            for i, paraphrases in zip(batch, generated):
+                outputs[i] = paraphrases
+
+        # Rejoin the pieces of split sentences, alternative by alternative
+        pieces = [[] for _ in sentences]
+        for owner, paraphrases in zip(owners, outputs):
+            pieces[owner].append(paraphrases)
+        return [[" ".join(alternatives) for alternatives in zip(*parts)] for parts in pieces]
+
+    def _generate(self, texts, num_return_sequences, settings):
+        # Tokenize and generate paraphrased responses for one padded batch
+        batch = self.tokenizer(
+            texts, truncation=True, padding="longest", max_length=self.max_length, return_tensors="pt"
         ).to(self.device)
 
-        translated = self.model.generate(
-            **batch, max_length=60, num_beams=10, num_return_sequences=num_return_sequences, temperature=1.5
-        )
-        # Decode and return the paraphrased text
-        return self.tokenizer.batch_decode(translated, skip_special_tokens=True)
-
-    def paraphrase_text(self, context):
-        # Split context into sentences and paraphrase each sentence
-        sentences = context.split(". ")
-        paraphrased_sentences = [self.get_response(sentence, 1)[0] for sentence in sentences]
-        # Join paraphrased sentences and return the result
-        return " ".join(paraphrased_sentences)
+        profile = self.profile or PROFILES["paraphrase"]
+        start = time.perf_counter()
+        with profile.apply(self.model):
+            translated = self.model.generate(**batch, num_return_sequences=num_return_sequences, **settings)
+        elapsed = time.perf_counter() - start
+
+        # Running average of the per-token cost of this beam width, which the
+        # adaptive preset uses to predict latency
+        if not settings.get("do_sample"):
+            cost = elapsed / (len(texts) * translated.shape[1])
+            previous = self.step_costs.get(settings["num_beams"], cost)
+            self.step_costs[settings["num_beams"]] = 0.7 * previous + 0.3 * cost
+
+        # generate returns num_return_sequences rows per input, grouped by input
+        decoded = self.tokenizer.batch_decode(translated, skip_special_tokens=True)
+        return [decoded[i * num_return_sequences:(i + 1) * num_return_sequences] for i in range(len(texts))]
+
+    def measure_presets(self, sentences, presets=None):
+        # Time every preset on sentences and score its output against the
+        # full_beam output (unigram F1); results are kept in preset_report.
+        # Generation bypasses the cache, so no preset is timed on cache hits
+        reference = [response[0] for response in self._paraphrase(sentences, 1, "full_beam", None)]
+        for name in presets or PRESETS:
+            start = time.perf_counter()
+            output = [response[0] for response in self._paraphrase(sentences, 1, name, None)]
+            elapsed = time.perf_counter() - start
+            self.preset_report[name] = {
+                "seconds_per_sentence": elapsed / len(sentences),
+                "agreement_with_full_beam": sum(map(unigram_f1, output, reference)) / len(sentences),
+            }
+        return self.preset_report
+
+    def paraphrase_text(self, context, preset=None, latency_budget=None):
+        return self.paraphrase_many([context], preset, latency_budget)[0]
+
+    def paraphrase_many(self, texts, preset=None, latency_budget=None):
+        # Split every text into sentences and paraphrase all of them together,
+        # so sentences from different texts share generate batches
+        split_texts = [text.split(". ") for text in texts]
+        sentences = [sentence for split in split_texts for sentence in split]
+        paraphrased = iter(response[0] for response in self.get_responses(sentences, 1, preset, latency_budget))
+
+        # Join paraphrased sentences per text and return the results
+        return [" ".join(next(paraphrased) for _ in split) for split in split_texts]
+
+    def stream_text(self, context, preset=None):
+        # Yield the paraphrase of context as it is produced; the pieces joined
+        # equal paraphrase_text(context, preset). With greedy decoding every
+        # new token is yielded, with other presets every finished sentence
+        preset = preset or self.preset
+        for i, sentence in enumerate(context.split(". ")):
+            if i:
+                yield " "
+            if preset == "greedy":
+                yield from self._stream_sentence(sentence)
+            else:
+                yield self.get_response(sentence, 1, preset)[0]
+
+    def _stream_sentence(self, sentence):
+        settings = generation_kwargs("greedy", 1, self.max_length)
+        key = self.cache.key(self.model_id, settings, sentence) if self.cache is not None else None
+        cached = self.cache.get(key) if key is not None else None
+        if cached is not None:
+            yield cached[0]
+            return
+
+        parts = []
+        for i, piece in enumerate(split_long_sentence(self.tokenizer, sentence, self.max_length)):
+            batch = self.tokenizer(
+                [piece], truncation=True, max_length=self.max_length, return_tensors="pt"
+            ).to(self.device)
+            text = ""
+            if i:
+                yield " "
+            for token_text in stream_generate(
+                self.model, self.tokenizer, batch, self.profile or PROFILES["paraphrase"], **settings
+            ):
+                text += token_text
+                yield token_text
+            parts.append(text)
+
+        if key is not None:
+            self.cache.put(key, [" ".join(parts)])
@@ -0,0 +1,180 @@
+import multiprocessing
+import os
+import time
+import traceback
+from multiprocessing.connection import wait
+
+from utils import get_model
+from utils.execution import ExecutionProfile
+from utils.registry import resolve_variant
+
+
+class ShardError(RuntimeError):
+    # Raised by ParaphrasePool.get_responses when shards failed. failures maps
+    # shard index -> reason; results holds the responses of every sentence,
+    # None for the sentences of failed shards
+    def __init__(self, failures, results):
+        super().__init__(
+            f"{len(failures)} shard(s) failed: " + "; ".join(f"shard {i}: {reason}" for i, reason in failures.items())
+        )
+        self.failures = failures
+        self.results = results
+
+
+def _worker(conn, paraphraser_kwargs):
+    # Worker process: build a Paraphraser and answer shards until told to stop
+    from .paraphrase import Paraphraser
+
+    paraphraser = Paraphraser(**paraphraser_kwargs)
+    while True:
+        task = conn.recv()
+        if task is None:
+            break
+        shard, sentences, num_return_sequences, preset = task
+        try:
+            conn.send((shard, True, paraphraser.get_responses(sentences, num_return_sequences, preset)))
+        except Exception:
+            conn.send((shard, False, traceback.format_exc()))
+    conn.close()
+
+
+class ParaphrasePool:
+    # Paraphrase with workers processes, each running its own Paraphraser with
+    # threads_per_worker PyTorch threads. Sentences are cut into shards of
+    # shard_size and handed to whichever worker is idle, so throughput scales
+    # with cores instead of being capped by intra-op scaling of one model.
+    #
+    # With the "fork" start method (the default where available) the torch
+    # model is loaded once in the parent and the workers share its weights
+    # copy-on-write; with "spawn" every worker loads its own copy. A worker that
+    # dies fails only the shard it was working on and is replaced.
+    #
+    # Other keyword arguments go to Paraphraser, except cache: the SQLite-backed
+    # cache can not be shared between processes
+    def __init__(self, workers=2, threads_per_worker=None, shard_size=16, start_method=None, **paraphraser_kwargs):
+        if "cache" in paraphraser_kwargs:
+            raise ValueError("ParaphrasePool does not support a paraphrase cache")
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+        self.shard_size = shard_size
+        paraphraser_kwargs.setdefault("profile", ExecutionProfile(self.threads_per_worker))
+        self.paraphraser_kwargs = paraphraser_kwargs
+
+        if start_method is None:
+            start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        self._context = multiprocessing.get_context(start_method)
+        quantized, backend = resolve_variant("paraphrase", paraphraser_kwargs.get("quantized"),
+                                             paraphraser_kwargs.get("backend"))
+        if start_method == "fork" and backend == "torch":
+            # Load before forking so the workers inherit the weights
+            get_model("paraphrase", quantized, backend)
+
+        self._processes = [None] * workers
+        self._conns = [None] * workers
+        for index in range(workers):
+            self._start_worker(index)
+
+    def _start_worker(self, index):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker, args=(child_conn, self.paraphraser_kwargs), daemon=True)
+        process.start()
+        child_conn.close()
+        self._processes[index] = process
+        self._conns[index] = parent_conn
+
+    def get_responses(self, sentences, num_return_sequences=1, preset=None):
+        # Same result as Paraphraser.get_responses, computed by the workers.
+        # Raises ShardError after all other shards have finished if any failed
+        shards = [sentences[i:i + self.shard_size] for i in range(0, len(sentences), self.shard_size)]
+        results = [None] * len(shards)
+        failures = {}
+        pending = list(range(len(shards)))[::-1]
+        # Worker index -> shard it is working on
+        busy = {}
+
+        while pending or busy:
+            for index in range(self.workers):
+                if index in busy or not pending:
+                    continue
+                if not self._processes[index].is_alive():
+                    self._start_worker(index)
+                shard = pending.pop()
+                self._conns[index].send((shard, shards[shard], num_return_sequences, preset))
+                busy[index] = shard
+
+            ready = wait([self._conns[index] for index in busy] + [self._processes[index].sentinel for index in busy])
+            for index, shard in list(busy.items()):
+                conn, process = self._conns[index], self._processes[index]
+                if conn not in ready and process.sentinel not in ready:
+                    continue
+                try:
+                    _, ok, payload = conn.recv()
+                except EOFError:
+                    # The worker died mid-shard
+                    process.join()
+                    ok, payload = False, f"worker exited with code {process.exitcode}"
+                    self._start_worker(index)
+                if ok:
+                    results[shard] = payload
+                else:
+                    failures[shard] = payload
+                del busy[index]
+
+        responses = [
+            response
+            for shard, result in enumerate(results)
+            for response in (result if shard not in failures else [None] * len(shards[shard]))
+        ]
+        if failures:
+            raise ShardError(failures, responses)
+        return responses
+
+    def paraphrase_text(self, context, preset=None):
+        return self.paraphrase_many([context], preset)[0]
+
+    def paraphrase_many(self, texts, preset=None):
+        # Split texts into sentences like Paraphraser.paraphrase_many and shard
+        # all sentences across the workers
+        split_texts = [text.split(". ") for text in texts]
+        sentences = [sentence for split in split_texts for sentence in split]
+        paraphrased = iter(response[0] for response in self.get_responses(sentences, 1, preset))
+        return [" ".join(next(paraphrased) for _ in split) for split in split_texts]
+
+    def close(self):
+        for conn, process in zip(self._conns, self._processes):
+            if process.is_alive():
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+        for conn, process in zip(self._conns, self._processes):
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def measure_scaling(sentences, worker_counts=(1, 2, 4), preset=None, **pool_kwargs):
+    # Sentences per second of a pool with each number of workers, and the
+    # speedup over the first; every pool gets the same total number of threads
+    # unless threads_per_worker is given
+    report = {}
+    for workers in worker_counts:
+        with ParaphrasePool(workers, **pool_kwargs) as pool:
+            # Warm-up, so worker start-up does not count
+            pool.get_responses(sentences[:workers], 1, preset)
+            start = time.perf_counter()
+            pool.get_responses(sentences, 1, preset)
+            seconds = time.perf_counter() - start
+        report[workers] = {"sentences_per_second": len(sentences) / seconds}
+
+    baseline = next(iter(report.values()))["sentences_per_second"] if report else None
+    for stats in report.values():
+        stats["speedup"] = stats["sentences_per_second"] / baseline
+    return report
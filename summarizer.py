@@ -1,18 +1,368 @@
 # summarizer.py
 
 import sys
+import heapq
 import math
-import nltk
-import spacy
-from nltk.stem import WordNetLemmatizer
+import os
+import pickle
+import tempfile
+from functools import lru_cache
 
+import numpy as np
 
-nltk.download('wordnet')
 
-nlp = spacy.load('en_core_web_sm')
-lemmatizer = WordNetLemmatizer()
+SPACY_MODEL = 'en_core_web_sm'
+LEMMA_CACHE_SIZE = 2 ** 16
+# Sentences scoring at least this multiple of the average are kept
+THRESHOLD_FACTOR = 1.3
+
+# spaCy pipelines and the WordNet lemmatizer are loaded on first use, so that
+# importing this module (e.g. from the GUI) does not load any NLP resources.
+_pipelines = {}
+_lemmatizer = None
+
+
+# Returns the shared spaCy pipeline. The slim pipeline only has the English
+# tokenizer and a rule-based sentencizer (no tagger, parser or NER), which is
+# all the TF-IDF scoring needs; sentence boundaries may differ slightly from
+# the dependency parser's.
+def get_nlp(slim=False):
+    if slim not in _pipelines:
+        import spacy
+
+        if slim:
+            nlp = spacy.blank('en')
+            nlp.add_pipe('sentencizer')
+        else:
+            nlp = spacy.load(SPACY_MODEL)
+        _pipelines[slim] = nlp
+
+    return _pipelines[slim]
+
+
+# Checks whether the WordNet corpus is installed locally, without downloading.
+def wordnet_available():
+    import nltk
+
+    try:
+        nltk.data.find('corpora/wordnet')
+    except LookupError:
+        return False
+    return True
+
+
+def get_lemmatizer():
+    global _lemmatizer
+
+    if _lemmatizer is None:
+        if not wordnet_available():
+            raise LookupError(
+                "WordNet corpus not found. Install it once with: python -c \"import nltk; nltk.download('wordnet')\""
+            )
+        from nltk.stem import WordNetLemmatizer
+
+        _lemmatizer = WordNetLemmatizer()
+
+    return _lemmatizer
+
+
+# Returns the TF-IDF term for a token, or None for non-alphanumeric tokens and
+# stop words. Without a spaCy lemma the lowercased word is lemmatized with
+# WordNet. Results are memoized in a bounded LRU cache shared by all calls, so
+# lemmatization cost grows with the vocabulary rather than the token count;
+# hit/miss statistics are available from word_term.cache_info().
+@lru_cache(maxsize=LEMMA_CACHE_SIZE)
+def word_term(word, lemma=None):
+    from spacy.lang.en.stop_words import STOP_WORDS
+
+    if not word.isalnum():
+        return None
+
+    if lemma is None:
+        lemma = get_lemmatizer().lemmatize(word.lower())
+    else:
+        lemma = lemma.lower()
+
+    return None if lemma in STOP_WORDS else lemma
+
+
+# Maps every sentence to a row of a sparse sentence-by-term count matrix.
+# Terms are looked up once per distinct token text (or text/lemma pair with
+# spacy_lemmas=True); the per-token work is done on the integer ids spaCy
+# already stores.
+def term_matrix(sentences, spacy_lemmas=False):
+    from scipy.sparse import csr_matrix
+
+    if not sentences:
+        return csr_matrix((0, 0)), {}
+
+    doc = sentences[0].doc
+    strings = doc.vocab.strings
+
+    rows = np.full(len(doc), -1, dtype=np.int64)
+    for i, sent in enumerate(sentences):
+        rows[sent.start:sent.end] = i
+
+    if spacy_lemmas:
+        if not doc.has_annotation("LEMMA"):
+            raise ValueError("spacy_lemmas=True needs a pipeline with a lemmatizer (slim=False)")
+        keys, token_keys = np.unique(doc.to_array(["ORTH", "LEMMA"]), axis=0, return_inverse=True)
+        words = [word_term(strings[int(orth)], strings[int(lemma)]) for orth, lemma in keys]
+    else:
+        keys, token_keys = np.unique(doc.to_array("ORTH"), return_inverse=True)
+        words = [word_term(strings[int(orth)]) for orth in keys]
+
+    vocab = {}
+    key_terms = np.array(
+        [-1 if word is None else vocab.setdefault(word, len(vocab)) for word in words],
+        dtype=np.int64,
+    )
+
+    token_terms = key_terms[token_keys.ravel()]
+    keep = (token_terms >= 0) & (rows >= 0)
+
+    # Duplicate (sentence, term) pairs are summed into counts
+    matrix = csr_matrix(
+        (np.ones(int(keep.sum())), (rows[keep], token_terms[keep])),
+        shape=(len(sentences), len(vocab)),
+    )
+    return matrix, vocab
+
+
+# Scores every row of the term matrix with the average Tf-Idf of its terms.
+# Sentences without any terms get NaN so they are never selected. idf can be
+# given per matrix column (e.g. from a corpus IdfIndex); by default it is
+# computed from the sentences themselves.
+def sentence_scores(matrix, idf=None):
+    total_sentences = matrix.shape[0]
+    unique_terms = np.diff(matrix.indptr)
+
+    # TF(t) = count of t in sentence / number of distinct terms in sentence
+    rows = np.repeat(np.arange(total_sentences), unique_terms)
+    tf = matrix.data / unique_terms[rows]
+
+    # IDF(t) = log10(total sentences / sentences containing t)
+    if idf is None:
+        sent_per_words = np.bincount(matrix.indices, minlength=matrix.shape[1])
+        idf = np.log10(total_sentences / sent_per_words)
+
+    totals = np.bincount(rows, weights=tf * idf[matrix.indices], minlength=total_sentences)
+
+    scores = np.full(total_sentences, np.nan)
+    has_terms = unique_terms > 0
+    scores[has_terms] = totals[has_terms] / unique_terms[has_terms]
+    return scores
+
+
+# Picks the summary sentences and returns their indices in document order.
+#
+# By default every sentence scoring at least THRESHOLD_FACTOR times the
+# average is kept. top_k keeps the k best sentences and ratio the best
+# fraction of the document (at least one sentence); both use a heap-based
+# partial sort. max_words / max_chars fill a word or character budget with the
+# best sentences that still fit, and can be combined with top_k or ratio. The
+# character budget counts the space summarize_doc puts before every sentence,
+# so the returned summary is at most max_chars long.
+def select_sentences(sentences, scores, top_k=None, ratio=None, max_words=None, max_chars=None):
+    scored = np.flatnonzero(~np.isnan(scores))
+    if len(scored) == 0:
+        return []
+
+    if ratio is not None:
+        top_k = max(1, round(ratio * len(sentences)))
+
+    if top_k is None and max_words is None and max_chars is None:
+        threshold = THRESHOLD_FACTOR * np.mean(scores[scored])
+        return [int(i) for i in np.flatnonzero(scores >= threshold)]
+
+    # Best first; nlargest keeps earlier sentences first among equal scores
+    if top_k is not None:
+        ranked = heapq.nlargest(top_k, scored.tolist(), key=lambda i: scores[i])
+    else:
+        heap = [(-scores[i], i) for i in scored.tolist()]
+        heapq.heapify(heap)
+        ranked = (heapq.heappop(heap)[1] for _ in range(len(heap)))
+
+    if max_words is not None or max_chars is not None:
+        selected = []
+        words = chars = 0
+        for i in ranked:
+            sent_words = len(sentences[i].text.split())
+            sent_chars = len(sentences[i].text) + 1
+            if max_words is not None and words + sent_words > max_words:
+                continue
+            if max_chars is not None and chars + sent_chars > max_chars:
+                continue
+            selected.append(i)
+            words += sent_words
+            chars += sent_chars
+            if words == max_words or chars == max_chars:
+                break
+        ranked = selected
+
+    return sorted(ranked)
+
+
+# With an index, terms are weighted by their corpus IDF instead of the IDF
+# over the document's own sentences. The remaining arguments choose the
+# selection mode, see select_sentences.
+def summarize_doc(doc, spacy_lemmas=False, index=None, top_k=None, ratio=None, max_words=None, max_chars=None):
+    sentences = list(doc.sents)
+
+    matrix, vocab = term_matrix(sentences, spacy_lemmas)
+    idf = None if index is None else index.idf(list(vocab))
+    scores = sentence_scores(matrix, idf)
+    selected = select_sentences(sentences, scores, top_k, ratio, max_words, max_chars)
+
+    return "".join(" " + sentences[i].text for i in selected)
+
+
+# Version string of the pipeline get_nlp(slim) would load, read from package
+# metadata so that it does not import spaCy.
+@lru_cache(maxsize=None)
+def model_version(slim=False):
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        if slim:
+            return 'spacy-blank-en-' + version('spacy')
+        return SPACY_MODEL + '-' + version(SPACY_MODEL)
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+# Everything besides the text that changes the summary, used as cache key.
+def summary_params(slim=False, spacy_lemmas=False, index=None, top_k=None, ratio=None, max_words=None, max_chars=None):
+    params = {
+        'threshold_factor': THRESHOLD_FACTOR,
+        'model': model_version(slim),
+        'spacy_lemmas': spacy_lemmas,
+        'selection': [top_k, ratio, max_words, max_chars],
+    }
+    if index is not None:
+        params['index'] = [os.path.abspath(index.path), index.num_documents]
+    return params
+
+
+# With a SummaryCache, repeated texts are answered from the cache without
+# parsing.
+def summarize_text(
+    text, slim=False, spacy_lemmas=False, index=None, cache=None, top_k=None, ratio=None, max_words=None, max_chars=None
+):
+    selection = (top_k, ratio, max_words, max_chars)
+
+    if cache is not None:
+        params = summary_params(slim, spacy_lemmas, index, *selection)
+        summary = cache.get(text, params)
+        if summary is not None:
+            return summary
+
+    # Converting received text into spaCy Doc object
+    summary = summarize_doc(get_nlp(slim)(text), spacy_lemmas, index, *selection)
+
+    if cache is not None:
+        cache.put(text, params, summary)
+    return summary
+
+
+# Summarizes many texts by streaming them through nlp.pipe. With n_process > 1
+# spaCy parses batches in worker processes; summaries are yielded lazily and
+# always in the same order as the input texts.
+def summarize_many(
+    texts, n_process=1, batch_size=64, slim=False, spacy_lemmas=False, index=None,
+    top_k=None, ratio=None, max_words=None, max_chars=None,
+):
+    for doc in get_nlp(slim).pipe(texts, n_process=n_process, batch_size=batch_size):
+        yield summarize_doc(doc, spacy_lemmas, index, top_k, ratio, max_words, max_chars)
+
+
+# Summarizes a document given as an iterable of text chunks (pages, paragraphs)
+# without holding the whole document in memory. The first pass parses each
+# chunk, collects document frequencies and spools the sentence term counts to
+# a temporary file; the second pass reads the spool back, scores sentences
+# against the final IDF and keeps at most max_sentences of those above the
+# usual THRESHOLD_FACTOR * average threshold in a heap. Chunks are parsed independently, so
+# a sentence spanning two chunks is scored as two sentences.
+def summarize_stream(chunks, max_sentences=20, batch_size=16, slim=False, spacy_lemmas=False, index=None):
+    vocab = {}
+    sent_per_words = np.zeros(0, dtype=np.int64)
+    # Per-term sum of count / unique_terms ** 2, which gives the average
+    # sentence score before the second pass
+    weights = np.zeros(0)
+    total_sentences = 0
+    scored_sentences = 0
+
+    with tempfile.TemporaryFile() as spool:
+        for doc in get_nlp(slim).pipe(chunks, batch_size=batch_size):
+            sentences = list(doc.sents)
+            matrix, chunk_vocab = term_matrix(sentences, spacy_lemmas)
+
+            term_ids = np.array([vocab.setdefault(word, len(vocab)) for word in chunk_vocab], dtype=np.int64)
+            columns = term_ids[matrix.indices]
+            unique_terms = np.diff(matrix.indptr)
+            rows = np.repeat(np.arange(len(sentences)), unique_terms)
+
+            grow = len(vocab) - len(weights)
+            sent_per_words = np.pad(sent_per_words, (0, grow)) + np.bincount(columns, minlength=len(vocab))
+            weights = np.pad(weights, (0, grow)) + np.bincount(
+                columns, weights=matrix.data / unique_terms[rows] ** 2, minlength=len(vocab)
+            )
+
+            has_terms = np.flatnonzero(unique_terms)
+            pickle.dump(
+                [
+                    (
+                        total_sentences + i,
+                        sentences[i].text,
+                        columns[matrix.indptr[i]:matrix.indptr[i + 1]],
+                        matrix.data[matrix.indptr[i]:matrix.indptr[i + 1]],
+                    )
+                    for i in has_terms
+                ],
+                spool,
+            )
+            total_sentences += len(sentences)
+            scored_sentences += len(has_terms)
+
+        if scored_sentences == 0:
+            return ''
+
+        if index is None:
+            idf = np.log10(total_sentences / sent_per_words)
+        else:
+            idf = index.idf(list(vocab))
+        threshold = THRESHOLD_FACTOR * (weights @ idf) / scored_sentences
+
+        # Min-heap on (score, -position): the weakest candidate, and among
+        # equal scores the later one, is evicted first
+        candidates = []
+        spool.seek(0)
+        while True:
+            try:
+                records = pickle.load(spool)
+            except EOFError:
+                break
+
+            for position, text, columns, counts in records:
+                unique = len(columns)
+                score = np.sum(counts / unique * idf[columns]) / unique
+                if score < threshold:
+                    continue
+                if len(candidates) < max_sentences:
+                    heapq.heappush(candidates, (score, -position, text))
+                else:
+                    heapq.heappushpop(candidates, (score, -position, text))
+
+    selected = sorted(candidates, key=lambda candidate: -candidate[1])
+    return "".join(" " + text for _, _, text in selected)
+
+
+# Original dict-of-dicts implementation, kept as the reference the sparse engine
+# is checked against. Sentences are keyed by sent[:15].
+def summarize_text_reference(text):
+    nlp = get_nlp()
+    lemmatizer = get_lemmatizer()
 
-def summarize_text(text):
     def frequency_matrix(sentences):
         freq_matrix = {}
         stopWords = nlp.Defaults.stop_words
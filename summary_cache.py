@@ -0,0 +1,92 @@
+# summary_cache.py
+
+import hashlib
+import json
+import sqlite3
+import time
+import unicodedata
+
+
+# Persistent summary cache backed by SQLite.
+#
+# Entries are keyed by a SHA-256 of the normalized text plus the summarizer
+# parameters, so the same article with different whitespace hits the same
+# entry while a different threshold or model does not. When the stored
+# summaries exceed max_bytes the least recently used entries are evicted.
+# Access times are only refreshed when older than touch_interval seconds, so
+# most hits are pure reads and never take the write lock.
+#
+# SQLite's file locking makes the cache safe to share between processes; each
+# process (and thread) should open its own SummaryCache on the same path.
+class SummaryCache:
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, touch_interval=60.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL only syncs at checkpoints; a crash can lose the
+        # last writes but never corrupts the cache
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "key TEXT PRIMARY KEY, summary TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS summaries_last_access ON summaries (last_access)")
+
+    @staticmethod
+    def key(text, params):
+        text = " ".join(unicodedata.normalize("NFC", text).split())
+        payload = text + "\0" + json.dumps(params, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, text, params):
+        key = self.key(text, params)
+        row = self.conn.execute("SELECT summary, last_access FROM summaries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        now = time.time()
+        if now - row[1] > self.touch_interval:
+            self.conn.execute("UPDATE summaries SET last_access = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, text, params, summary):
+        key = self.key(text, params)
+        size = len(summary.encode("utf-8"))
+
+        # BEGIN IMMEDIATE takes the write lock up front, so the size check and
+        # eviction see a consistent table across processes
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, summary, size, time.time()),
+            )
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+            if total > self.max_bytes:
+                stale = []
+                for stale_key, stale_size in self.conn.execute(
+                    "SELECT key, size FROM summaries ORDER BY last_access"
+                ):
+                    if total <= self.max_bytes:
+                        break
+                    stale.append((stale_key,))
+                    total -= stale_size
+                self.conn.executemany("DELETE FROM summaries WHERE key = ?", stale)
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        self.conn.close()
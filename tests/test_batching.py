@@ -0,0 +1,39 @@
+import unittest
+from utils.batching import padding_stats, schedule_batches, split_long_sentence
+
+
+def word_tokenizer(text, truncation=False):
+    # One id per word plus the end-of-sequence token
+    return {"input_ids": list(range(len(text.split()) + 1))}
+
+
+class TestScheduler(unittest.TestCase):
+    def test_batches_respect_budget_and_size(self):
+        lengths = [5, 40, 6, 38, 7, 5]
+        batches = schedule_batches(lengths, token_budget=80, max_batch_size=3)
+        self.assertEqual(sorted(i for batch in batches for i in batch), list(range(len(lengths))))
+        for batch in batches:
+            self.assertLessEqual(len(batch), 3)
+            self.assertLessEqual(len(batch) * max(lengths[i] for i in batch), 80)
+        # Short and long sentences are not mixed
+        self.assertIn([0, 5, 2], batches)
+
+    def test_padding_stats(self):
+        stats = padding_stats([2, 4], [[0, 1]])
+        self.assertEqual(stats, [{"size": 2, "real_tokens": 6, "padded_tokens": 8, "padding_waste": 0.25}])
+
+    def test_split_long_sentence_at_clauses(self):
+        sentence = "one two three four, five six seven eight; nine ten eleven twelve"
+        self.assertEqual(split_long_sentence(word_tokenizer, sentence, 20), [sentence])
+        self.assertEqual(
+            split_long_sentence(word_tokenizer, sentence, 6),
+            ["one two three four,", "five six seven eight;", "nine ten eleven twelve"],
+        )
+
+    def test_split_long_clause_on_words(self):
+        pieces = split_long_sentence(word_tokenizer, "a b c d e f g", 4)
+        self.assertEqual(pieces, ["a b c", "d e f", "g"])
+
+
+if __name__ == "__main__":
+    unittest.main()
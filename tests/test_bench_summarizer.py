@@ -0,0 +1,33 @@
+import unittest
+
+import summarizer
+from bench_summarizer import run_benchmark, run_stages, synthetic_corpus
+
+
+class TestBenchSummarizer(unittest.TestCase):
+    def test_synthetic_corpus_scales(self):
+        self.assertAlmostEqual(len(synthetic_corpus(10)), 10 * len(synthetic_corpus(1)), delta=10)
+
+    def test_matches_reference(self):
+        result = run_benchmark([1, 10])
+        for stats in result:
+            self.assertTrue(stats["matches_reference"])
+            self.assertEqual(
+                set(stats["seconds"]),
+                {"parse", "frequency_matrix", "tf_idf_scoring", "selection", "summary_build"},
+            )
+
+    def test_shared_pipeline_max_length_restored(self):
+        nlp = summarizer.get_nlp()
+        text = synthetic_corpus(1)
+        previous = nlp.max_length
+        nlp.max_length = len(text) // 2
+        try:
+            run_stages(text)
+            self.assertEqual(nlp.max_length, len(text) // 2)
+        finally:
+            nlp.max_length = previous
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+from paraphraser.decoding import choose_beam_width, generation_kwargs, unigram_f1
+
+
+class TestDecoding(unittest.TestCase):
+    def test_generation_kwargs(self):
+        self.assertEqual(generation_kwargs("full_beam", 1, 60), {"num_beams": 10, "do_sample": False, "max_length": 60})
+        self.assertEqual(generation_kwargs("greedy", 3, 60)["num_beams"], 3)
+        with self.assertRaises(ValueError):
+            generation_kwargs("unknown", 1, 60)
+
+    def test_choose_beam_width(self):
+        self.assertEqual(choose_beam_width({}, 100, 1.0), 1)
+        # 1 ms per token per beam: 100 tokens fit 4 beams in 0.5 s but not 8
+        self.assertEqual(choose_beam_width({1: 0.001}, 100, 0.5), 4)
+        self.assertEqual(choose_beam_width({1: 0.001}, 100, 10.0), 10)
+        self.assertEqual(choose_beam_width({1: 0.001}, 100, 0.01), 1)
+
+    def test_unigram_f1(self):
+        self.assertEqual(unigram_f1("the cat sat", "The cat sat"), 1.0)
+        self.assertEqual(unigram_f1("a b", "c d"), 0.0)
+        self.assertAlmostEqual(unigram_f1("a b", "a c"), 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import torch
+from utils.execution import PROFILES, ExecutionProfile, compare_profiles
+
+
+class TestExecutionProfile(unittest.TestCase):
+    def test_apply_sets_and_restores_threads(self):
+        threads = torch.get_num_threads()
+        with ExecutionProfile(intra_op_threads=1).apply():
+            self.assertEqual(torch.get_num_threads(), 1)
+            self.assertTrue(torch.is_inference_mode_enabled())
+        self.assertEqual(torch.get_num_threads(), threads)
+        self.assertFalse(torch.is_inference_mode_enabled())
+
+    def test_late_inter_op_request_warns(self):
+        current = torch.get_num_interop_threads()
+        with self.assertWarns(RuntimeWarning):
+            # The first request may still succeed; the second can not
+            for threads in (current + 1, current + 2):
+                with ExecutionProfile(inter_op_threads=threads).apply():
+                    pass
+        self.assertEqual(
+            ExecutionProfile(inter_op_threads=1).describe()["inter_op_threads_effective"],
+            torch.get_num_interop_threads(),
+        )
+
+    def test_compare_profiles(self):
+        original = PROFILES["paraphrase"]
+        matrix = torch.rand(64, 64)
+
+        def run():
+            with PROFILES["paraphrase"].apply():
+                matrix @ matrix
+
+        report = compare_profiles("paraphrase", run, {"default": ExecutionProfile(), "one_thread": ExecutionProfile(1)})
+        self.assertEqual(report["default"]["speedup"], 1.0)
+        self.assertEqual(report["one_thread"]["intra_op_threads"], 1)
+        self.assertIs(PROFILES["paraphrase"], original)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from hindencorp import HindEnCorp, split_of
+
+HAS_TENSORFLOW = importlib.util.find_spec("tensorflow") is not None
+
+LINES = [f"source{i}\t1-1\t0.9\tsentence {i}\tवाक्य {i}\n" for i in range(50)]
+
+
+class TestHindEnCorp(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "hindencorp05.plaintext")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.writelines(LINES[:10] + ["broken line\twith two fields\n"] + LINES[10:])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_records_in_order_and_invalid_lines_skipped(self):
+        corpus = HindEnCorp(self.path, workers=1, chunk_lines=7)
+        records = list(corpus.records())
+        self.assertEqual([record["en"] for record in records], [f"sentence {i}" for i in range(50)])
+        self.assertEqual(records[0]["hi"], "वाक्य 0")
+        self.assertEqual(records[0]["alignment_quality"], "0.9")
+        self.assertEqual(corpus.invalid_lines, 1)
+
+        # A second pass counts again from zero
+        list(corpus.records("train"))
+        self.assertEqual((corpus.lines_read, corpus.invalid_lines), (51, 1))
+
+        with self.assertRaises(ValueError):
+            list(HindEnCorp(self.path, workers=1, strict=True).records())
+
+    def test_parallel_parsing_matches_serial(self):
+        serial = list(HindEnCorp(self.path, workers=1).records())
+        self.assertEqual(list(HindEnCorp(self.path, workers=2, chunk_lines=4).records()), serial)
+
+    def test_splits_are_deterministic(self):
+        corpus = HindEnCorp(self.path, workers=1, splits={"train": 0.5, "test": 0.5})
+        train = list(corpus.pairs("hi-en", "train"))
+        test = list(corpus.pairs("hi-en", "test"))
+        self.assertEqual(len(train) + len(test), 50)
+        self.assertEqual(train, list(corpus.pairs("hi-en", "train")))
+        self.assertTrue(all(source.startswith("वाक्य") for source, _ in train))
+        self.assertEqual(split_of("f" * 40), "test")
+
+    @unittest.skipUnless(HAS_TENSORFLOW, "tensorflow is not installed")
+    def test_tf_dataset(self):
+        dataset = HindEnCorp(self.path, workers=1).tf_dataset(split=None)
+        source, target = next(iter(dataset))
+        self.assertEqual(source.numpy().decode("utf-8"), "sentence 0")
+        self.assertEqual(target.numpy().decode("utf-8"), "वाक्य 0")
+
+
+if __name__ == "__main__":
+    unittest.main()
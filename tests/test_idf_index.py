@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+from idf_index import IdfIndex
+from summarizer import summarize_text
+
+
+class TestIdfIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "index")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_incremental_updates_persist(self):
+        index = IdfIndex(self.path)
+        index.add_documents(["The cat sat on the mat.", "A dog chased the cat."])
+        index.add_documents(["Rockets fly to the moon."])
+
+        reopened = IdfIndex(self.path)
+        self.assertEqual(reopened.num_documents, 3)
+        self.assertEqual(reopened.df[reopened.terms["cat"]], 2)
+        self.assertEqual(reopened.df[reopened.terms["moon"]], 1)
+        self.assertGreater(reopened.idf(["moon"])[0], reopened.idf(["cat"])[0])
+        self.assertGreater(reopened.idf(["unseen"])[0], reopened.idf(["moon"])[0])
+
+    def test_summarize_with_index(self):
+        index = IdfIndex(self.path)
+        index.add_documents(["The cat sat on the mat.", "A dog chased the cat."])
+        summary = summarize_text("The cat sat. Rockets fly to the moon and back. The cat ran.", index=index)
+        self.assertIn("Rockets", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import importlib.util
+import unittest
+from utils import get_model, model_id
+from utils.execution import ExecutionProfile
+from utils.onnx_backend import parity_check, session_options
+
+HAS_OPTIMUM = importlib.util.find_spec("optimum") is not None
+
+
+@unittest.skipUnless(HAS_OPTIMUM, "optimum[onnxruntime] is not installed")
+class TestOnnxBackend(unittest.TestCase):
+    def test_session_options_follow_profile(self):
+        options = session_options(ExecutionProfile(intra_op_threads=2, inter_op_threads=1))
+        self.assertEqual(options.intra_op_num_threads, 2)
+        self.assertEqual(options.inter_op_num_threads, 1)
+
+    def test_parity_with_pytorch(self):
+        for name in ("paraphrase", "en-hi", "hi-en"):
+            report = parity_check(name)
+            self.assertEqual(report["greedy"]["exact_match"], 1.0, report["greedy"]["mismatches"])
+            self.assertEqual(report["beam4"]["exact_match"], 1.0, report["beam4"]["mismatches"])
+            self.assertGreater(report["beam4"]["onnx_sentences_per_second"], 0)
+
+    def test_backend_is_a_separate_variant(self):
+        self.assertIsNot(get_model("en-hi", backend="onnx")[1], get_model("en-hi", backend="torch")[1])
+        self.assertEqual(model_id("en-hi", backend="onnx"), "Helsinki-NLP/opus-mt-en-hi+onnx")
+        with self.assertRaises(ValueError):
+            get_model("en-hi", quantized=True, backend="onnx")
+
+
+if __name__ == "__main__":
+    unittest.main()
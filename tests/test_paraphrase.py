@@ -1,14 +1,68 @@
- 
 import unittest
+from paraphraser.cache import ParaphraseCache
 from paraphraser.paraphrase import Paraphraser
 
 class TestParaphraser(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.paraphraser = Paraphraser(batch_size=2)
+
     def test_paraphrase_text(self):
-        paraphraser = Paraphraser()
+        paraphraser = self.paraphraser
         input_text = "This is a test sentence."
         result = paraphraser.paraphrase_text(input_text)
         self.assertIsInstance(result, str)
         self.assertNotEqual(result, input_text)
 
+    def test_batched_matches_unbatched(self):
+        sentences = ["The weather is nice today", "I am going to the market", "He plays football every weekend"]
+        unbatched = [self.paraphraser.get_response(sentence)[0] for sentence in sentences]
+        batched = [response[0] for response in self.paraphraser.get_responses(sentences)]
+        self.assertEqual(batched, unbatched)
+
+    def test_paraphrase_many(self):
+        texts = ["The weather is nice today. I am going to the market", "He plays football every weekend"]
+        self.assertEqual(
+            self.paraphraser.paraphrase_many(texts), [self.paraphraser.paraphrase_text(text) for text in texts]
+        )
+
+    def test_stream_text_matches_paraphrase_text(self):
+        text = "The weather is nice today. I am going to the market"
+        for preset in ("greedy", "small_beam"):
+            pieces = list(self.paraphraser.stream_text(text, preset))
+            self.assertEqual("".join(pieces), self.paraphraser.paraphrase_text(text, preset))
+
+    def test_decoding_presets(self):
+        sentence = "The weather is nice today"
+        for preset in ("greedy", "small_beam", "sampling"):
+            self.assertIsInstance(self.paraphraser.get_response(sentence, preset=preset)[0], str)
+        with self.assertRaises(ValueError):
+            self.paraphraser.get_response(sentence, preset="adaptive")
+        result = self.paraphraser.get_response(sentence, preset="adaptive", latency_budget=5.0)
+        self.assertIsInstance(result[0], str)
+
+    def test_measure_presets_bypasses_cache(self):
+        cache = ParaphraseCache()
+        self.paraphraser.cache = cache
+        try:
+            report = self.paraphraser.measure_presets(["The weather is nice today"], ["greedy", "full_beam"])
+            self.assertEqual(set(report), {"greedy", "full_beam"})
+            self.assertEqual(cache.stats()["misses"] + cache.stats()["memory_hits"], 0)
+        finally:
+            self.paraphraser.cache = None
+
+    def test_cache_skips_repeated_sentences(self):
+        cache = ParaphraseCache()
+        self.paraphraser.cache = cache
+        try:
+            sentences = ["The weather is nice today", "The  weather is nice today"]
+            first = self.paraphraser.get_responses(sentences)
+            self.assertEqual(first[0], first[1])
+            self.assertEqual(self.paraphraser.get_responses(sentences[:1]), first[:1])
+            self.assertEqual(cache.stats()["memory_hits"], 1)
+            self.assertEqual(cache.stats()["misses"], 2)
+        finally:
+            self.paraphraser.cache = None
+
 if __name__ == "__main__":
     unittest.main()
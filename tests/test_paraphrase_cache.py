@@ -0,0 +1,65 @@
+import os
+import tempfile
+import threading
+import unittest
+from paraphraser.cache import ParaphraseCache
+
+
+class TestParaphraseCache(unittest.TestCase):
+    def test_key_normalizes_whitespace(self):
+        self.assertEqual(
+            ParaphraseCache.key("model", {"num_beams": 10}, "Hello  world "),
+            ParaphraseCache.key("model", {"num_beams": 10}, "Hello world"),
+        )
+        self.assertNotEqual(
+            ParaphraseCache.key("model", {"num_beams": 10}, "Hello world"),
+            ParaphraseCache.key("model", {"num_beams": 4}, "Hello world"),
+        )
+
+    def test_lru_eviction(self):
+        cache = ParaphraseCache(max_entries=2)
+        cache.put("a", ["1"])
+        cache.put("b", ["2"])
+        cache.get("a")
+        cache.put("c", ["3"])
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), ["1"])
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_disk_tier_usable_from_other_thread(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParaphraseCache(max_entries=1, path=os.path.join(tmp, "paraphrases.db"))
+            cache.put("a", ["1"])
+            errors = []
+
+            def worker():
+                try:
+                    cache.put("b", ["2"])
+                    # "a" was evicted from memory and comes from disk
+                    self.assertEqual(cache.get("a"), ["1"])
+                except Exception as e:
+                    errors.append(e)
+
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+            cache.close()
+            self.assertEqual(errors, [])
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "paraphrases.db")
+            cache = ParaphraseCache(path=path)
+            cache.put("a", ["1", "2"])
+            cache.close()
+
+            reopened = ParaphraseCache(path=path)
+            self.assertEqual(reopened.get("a"), ["1", "2"])
+            self.assertEqual(reopened.get("a"), ["1", "2"])
+            self.assertEqual(reopened.stats()["disk_hits"], 1)
+            self.assertEqual(reopened.stats()["memory_hits"], 1)
+            reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import unittest
+from unittest import mock
+from paraphraser import ParaphrasePool, Paraphraser, ShardError
+
+SENTENCES = ["The weather is nice today", "I am going to the market", "He plays football every weekend",
+             "She reads a book", "They went home early"]
+
+
+def crash_on_marker(self, sentences, *args):
+    if "CRASH" in sentences:
+        os._exit(1)
+    return original_get_responses(self, sentences, *args)
+
+
+original_get_responses = Paraphraser.get_responses
+
+
+class TestParaphrasePool(unittest.TestCase):
+    def test_matches_single_process(self):
+        expected = Paraphraser().get_responses(SENTENCES, preset="greedy")
+        with ParaphrasePool(workers=2, threads_per_worker=1, shard_size=2) as pool:
+            self.assertEqual(pool.get_responses(SENTENCES, preset="greedy"), expected)
+            texts = ["The weather is nice today. I am going to the market", "She reads a book"]
+            self.assertEqual(pool.paraphrase_many(texts, "greedy"), Paraphraser().paraphrase_many(texts, "greedy"))
+
+    def test_crash_fails_only_its_shard(self):
+        # Workers are forked, so they inherit the patched method
+        with mock.patch.object(Paraphraser, "get_responses", crash_on_marker):
+            with ParaphrasePool(workers=2, threads_per_worker=1, shard_size=2, start_method="fork") as pool:
+                with self.assertRaises(ShardError) as raised:
+                    pool.get_responses(SENTENCES[:2] + ["CRASH"] + SENTENCES[2:], preset="greedy")
+                self.assertEqual(list(raised.exception.failures), [1])
+                results = raised.exception.results
+                self.assertEqual([result is None for result in results], [False, False, True, True, False, False])
+
+                # The crashed worker is replaced
+                self.assertEqual(len(pool.get_responses(SENTENCES, preset="greedy")), len(SENTENCES))
+
+    def test_worker_exception_is_reported(self):
+        with ParaphrasePool(workers=1, threads_per_worker=1) as pool:
+            with self.assertRaises(ShardError):
+                pool.get_responses(SENTENCES, preset="no_such_preset")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import torch
+from utils import get_model, quantization
+from utils.execution import ExecutionProfile
+from utils.quantization import load_quantized, quantized_cache_path, regression_check
+from utils.registry import MODELS
+
+
+class TestQuantization(unittest.TestCase):
+    def test_quantized_model_is_cached_on_disk(self):
+        tokenizer, model, device = get_model("en-hi", quantized=True)
+        self.assertEqual(device, "cpu")
+        self.assertTrue(os.path.exists(quantized_cache_path(MODELS["en-hi"][0])))
+        self.assertIsNot(model, get_model("en-hi", quantized=False)[1])
+
+    def test_cached_state_dict_reloads_and_recovers(self):
+        model_name, tokenizer_class, model_class = MODELS["en-hi"]
+        tokenizer = tokenizer_class.from_pretrained(model_name)
+        inputs = tokenizer(["How are you?"], return_tensors="pt")
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(quantization, "QUANTIZED_CACHE_DIR", tmp):
+            fresh = load_quantized(model_name, model_class)
+            cached = load_quantized(model_name, model_class)
+            self.assertFalse(cached.training)
+            with torch.no_grad():
+                self.assertTrue(bool((cached.generate(**inputs) == fresh.generate(**inputs)).all()))
+
+            # A corrupt cache file is replaced instead of failing every start
+            with open(quantized_cache_path(model_name), "wb") as f:
+                f.write(b"not a state dict")
+            self.assertIsNotNone(load_quantized(model_name, model_class))
+            torch.load(quantized_cache_path(model_name), weights_only=True)
+            self.assertEqual([name for name in os.listdir(tmp) if name.endswith(".tmp")], [])
+
+    def test_int8_model_runs_under_bf16_profile(self):
+        tokenizer, model, _ = get_model("en-hi", quantized=True)
+        profile = ExecutionProfile(bf16=True)
+        # Force autocast on even where the CPU has no native bf16
+        profile.bf16 = True
+        inputs = tokenizer(["How are you?"], return_tensors="pt")
+        with profile.apply(model):
+            generated = model.generate(**inputs, max_new_tokens=5)
+        self.assertEqual(generated.shape[0], 1)
+
+    def test_regression_check(self):
+        report = regression_check("en-hi")
+        self.assertEqual(set(report), {"fp32", "int8", "exact_match", "unigram_f1", "outputs"})
+        self.assertLess(report["int8"]["state_dict_bytes"], report["fp32"]["state_dict_bytes"])
+        self.assertGreaterEqual(report["unigram_f1"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import threading
+import unittest
+from paraphraser import Paraphraser
+from utils import get_model, model_stats, unload_model
+
+
+class TestRegistry(unittest.TestCase):
+    def test_paraphrasers_share_model(self):
+        first = Paraphraser()
+        second = Paraphraser()
+        self.assertIs(first.model, second.model)
+        self.assertIn("load_seconds", model_stats()["paraphrase"])
+
+    def test_concurrent_first_use_loads_once(self):
+        unload_model("en-hi")
+        models = []
+        threads = [threading.Thread(target=lambda: models.append(get_model("en-hi")[1])) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(model) for model in models}), 1)
+
+    def test_unload(self):
+        model = get_model("hi-en")[1]
+        unload_model("hi-en")
+        self.assertIsNot(get_model("hi-en")[1], model)
+
+    def test_unknown_model(self):
+        with self.assertRaises(KeyError):
+            get_model("fr-en")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import translator
+from utils import get_model
+from utils.shortlist import LexicalShortlist, parity_check, shortlisted, special_ids
+
+PAIRS = [
+    ("How are you?", "आप कैसे हैं?"),
+    ("The train leaves at seven in the morning.", "ट्रेन सुबह सात बजे निकलती है।"),
+    ("Please close the door when you leave.", "कृपया जाते समय दरवाज़ा बंद कर दें।"),
+]
+
+
+class TestShortlist(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tokenizer, cls.model, _ = get_model("en-hi")
+
+    def test_table_round_trip(self):
+        shortlist = LexicalShortlist.from_pairs(self.tokenizer, PAIRS, top_k=5, common_size=3)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "en-hi.npz")
+            shortlist.save(path)
+            loaded = LexicalShortlist.load(path)
+        input_ids = self.tokenizer(["How are you?"])["input_ids"]
+        candidates = loaded.candidates(input_ids, special_ids(self.tokenizer))
+        np.testing.assert_array_equal(candidates, shortlist.candidates(input_ids, special_ids(self.tokenizer)))
+        self.assertIn(self.tokenizer.eos_token_id, candidates)
+        self.assertLess(len(candidates), self.model.config.vocab_size)
+
+    def test_full_candidate_set_matches_full_output(self):
+        inputs = self.tokenizer(["How are you?"], return_tensors="pt")
+        expected = self.model.generate(**inputs)
+        clone = shortlisted(self.model, np.arange(self.model.config.vocab_size))
+        self.assertTrue(bool((clone.generate(**inputs) == expected).all()))
+
+    def test_shared_model_is_not_changed(self):
+        head = self.model.lm_head
+        clone = shortlisted(self.model, np.array(special_ids(self.tokenizer)))
+        self.assertIs(self.model.lm_head, head)
+        self.assertIsNot(clone.lm_head, head)
+        self.assertIs(clone.model, self.model.model)
+
+        # The full model still decodes over the whole vocabulary while the
+        # shortlisted copy exists
+        inputs = self.tokenizer(["How are you?"], return_tensors="pt")
+        logits = self.model(**inputs, decoder_input_ids=inputs["input_ids"][:, :1]).logits
+        self.assertTrue(bool(logits.isfinite().all()))
+
+    def test_head_is_detached_from_the_model(self):
+        clone = shortlisted(self.model, np.array(special_ids(self.tokenizer)))
+        self.assertIsNone(clone.lm_head.weight.grad_fn)
+        self.assertFalse(clone.lm_head.weight.requires_grad)
+
+    def test_translator_and_parity_check(self):
+        shortlist = LexicalShortlist.from_model("en-hi", [source for source, _ in PAIRS], top_k=10, common_size=10)
+        translator.SHORTLISTS["en-hi"] = shortlist
+        try:
+            outputs = translator.translate_sentences([source for source, _ in PAIRS], "en-hi")
+        finally:
+            translator.SHORTLISTS["en-hi"] = None
+        self.assertEqual(len(outputs), len(PAIRS))
+
+        report = parity_check("en-hi", shortlist, [source for source, _ in PAIRS])
+        self.assertTrue(0 <= report["differ_rate"] <= 1)
+        self.assertLess(report["shortlist_fraction"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import threading
+import unittest
+from utils import get_model
+from utils.execution import ExecutionProfile
+from utils.streaming import stream_generate
+
+
+class TestStreamGenerate(unittest.TestCase):
+    def test_closing_stops_generate(self):
+        tokenizer, model, device = get_model("en-hi")
+        inputs = tokenizer(["How are you?"], return_tensors="pt").to(device)
+        lengths = []
+        generate = model.generate
+
+        def recording_generate(**kwargs):
+            output = generate(**kwargs)
+            lengths.append(output.shape[1])
+            return output
+
+        model.generate = recording_generate
+        try:
+            threads = threading.active_count()
+            pieces = stream_generate(
+                model, tokenizer, inputs, ExecutionProfile(), num_beams=1, min_new_tokens=200, max_new_tokens=200
+            )
+            next(pieces)
+            pieces.close()
+        finally:
+            del model.generate
+        self.assertEqual(threading.active_count(), threads)
+        self.assertLess(lengths[0], 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
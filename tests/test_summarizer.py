@@ -0,0 +1,67 @@
+import os
+import unittest
+from summarizer import get_nlp, summarize_many, summarize_stream, summarize_text, summarize_text_reference, word_term
+
+TEST_TEXT = os.path.join(os.path.dirname(__file__), "..", "Test.txt")
+
+
+class TestSummarizer(unittest.TestCase):
+    def setUp(self):
+        with open(TEST_TEXT, encoding="utf-8") as f:
+            self.text = f.read()
+
+    def test_matches_reference(self):
+        self.assertEqual(summarize_text(self.text), summarize_text_reference(self.text))
+
+    def test_empty_text(self):
+        self.assertEqual(summarize_text(""), "")
+
+    def test_slim_pipeline(self):
+        summary = summarize_text(self.text, slim=True)
+        self.assertIsInstance(summary, str)
+        self.assertTrue(summary)
+
+    def test_lemma_cache_hits_on_repeated_text(self):
+        summarize_text(self.text)
+        hits = word_term.cache_info().hits
+        summarize_text(self.text)
+        self.assertGreater(word_term.cache_info().hits, hits)
+
+    def test_summarize_many_keeps_order(self):
+        texts = [self.text, "", self.text[: len(self.text) // 2]]
+        self.assertEqual(list(summarize_many(texts, batch_size=2)), [summarize_text(t) for t in texts])
+
+    def test_top_k_and_ratio(self):
+        sentences = list(get_nlp()(self.text).sents)
+        top = summarize_text(self.text, top_k=3)
+        self.assertEqual(len([s for s in sentences if s.text in top]), 3)
+        self.assertEqual(summarize_text(self.text, ratio=3 / len(sentences)), top)
+
+    def test_budget_keeps_document_order(self):
+        sentences = list(get_nlp()(self.text).sents)
+        summary = summarize_text(self.text, max_words=60)
+        self.assertLessEqual(len(summary.split()), 60)
+        kept = [s.text for s in sentences if s.text in summary]
+        self.assertEqual("".join(" " + s for s in kept), summary)
+
+    def test_char_budget_includes_separators(self):
+        # Exactly the length of the best sentence without its separator
+        best = summarize_text(self.text, top_k=1)
+        for max_chars in (len(best) - 1, len(best), 200):
+            summary = summarize_text(self.text, max_chars=max_chars)
+            self.assertLessEqual(len(summary), max_chars)
+        self.assertEqual(summarize_text(self.text, max_chars=len(best)), best)
+
+    def test_stream_single_chunk_matches_summarize_text(self):
+        self.assertEqual(summarize_stream([self.text], max_sentences=1000), summarize_text(self.text))
+
+    def test_stream_keeps_at_most_max_sentences(self):
+        paragraphs = [self.text[i:i + 500] for i in range(0, len(self.text), 500)]
+        full = summarize_stream(iter(paragraphs), max_sentences=1000)
+        summary = summarize_stream(iter(paragraphs), max_sentences=2)
+        self.assertTrue(summary)
+        self.assertLess(len(summary), len(full))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+from summary_cache import SummaryCache
+from summarizer import summarize_text
+
+
+class TestSummaryCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "summaries.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_hit_after_put_with_normalized_text(self):
+        cache = SummaryCache(self.path)
+        self.assertIsNone(cache.get("Some  text.", {"mode": "a"}))
+        cache.put("Some  text.", {"mode": "a"}, "summary")
+        self.assertEqual(SummaryCache(self.path).get("Some text.\n", {"mode": "a"}), "summary")
+        self.assertIsNone(cache.get("Some text.", {"mode": "b"}))
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+    def test_evicts_least_recently_used(self):
+        cache = SummaryCache(self.path, max_bytes=10, touch_interval=0)
+        cache.put("first", {}, "aaaa")
+        cache.put("second", {}, "bbbb")
+        cache.get("first", {})
+        cache.put("third", {}, "cccc")
+        self.assertEqual(cache.get("first", {}), "aaaa")
+        self.assertIsNone(cache.get("second", {}))
+        self.assertEqual(cache.get("third", {}), "cccc")
+
+    def test_recent_hit_does_not_write(self):
+        cache = SummaryCache(self.path)
+        cache.put("first", {}, "aaaa")
+        changes = cache.conn.total_changes
+        self.assertEqual(cache.get("first", {}), "aaaa")
+        self.assertEqual(cache.conn.total_changes, changes)
+
+    def test_summarize_text_uses_cache(self):
+        cache = SummaryCache(self.path)
+        text = "The cat sat on the mat. Rockets fly to the moon and back. The cat ran away."
+        summary = summarize_text(text, cache=cache)
+        self.assertEqual(summarize_text(text, cache=cache), summary)
+        self.assertEqual(cache.hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from translation_memory import TranslationMemory
+
+
+class TestTranslationMemory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "memory.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_exact_match_is_normalized_and_persistent(self):
+        memory = TranslationMemory(self.path)
+        memory.add("Please close  the door.", "कृपया दरवाज़ा बंद करें।", "en-hi")
+        memory.close()
+
+        memory = TranslationMemory(self.path)
+        self.assertEqual(memory.lookup(" Please close the door.\n", "en-hi"), ("कृपया दरवाज़ा बंद करें।", 1.0))
+        self.assertIsNone(memory.lookup("Please close the door.", "hi-en"))
+
+    def test_fuzzy_threshold(self):
+        memory = TranslationMemory(fuzzy_threshold=0.8)
+        memory.add("Terms and conditions apply to all orders.", "translation", "en-hi")
+        translation, score = memory.lookup("Terms and conditions apply to all order.", "en-hi")
+        self.assertEqual(translation, "translation")
+        self.assertTrue(0.8 <= score < 1.0)
+        self.assertIsNone(memory.lookup("The weather is nice today.", "en-hi"))
+
+        memory.fuzzy_threshold = None
+        self.assertIsNone(memory.lookup("Terms and conditions apply to all order.", "en-hi"))
+        self.assertEqual(memory.stats()["exact_hits"], 0)
+        self.assertEqual(memory.stats()["fuzzy_hits"], 1)
+        self.assertEqual(memory.stats()["misses"], 2)
+
+    def test_fuzzy_match_ignores_longer_sentences_sharing_more_ngrams(self):
+        memory = TranslationMemory(fuzzy_threshold=0.8)
+        query = "Terms and conditions apply to all order."
+        memory.add_many(
+            [(f"{query} Offer {i} is valid until the end of the month for every customer.", "long") for i in range(60)],
+            "en-hi",
+        )
+        memory.add("Terms and conditions apply to all orders.", "short", "en-hi")
+        translation, score = memory.lookup(query, "en-hi")
+        self.assertEqual(translation, "short")
+        self.assertTrue(0.8 <= score < 1.0)
+
+    def test_tsv_round_trip(self):
+        memory = TranslationMemory()
+        memory.add_many([("How are you?", "आप कैसे हैं?"), ("Thank you.", "धन्यवाद।")], "en-hi")
+        tsv_path = os.path.join(self.tmp.name, "memory.tsv")
+        self.assertEqual(memory.export_tsv(tsv_path, "en-hi"), 2)
+
+        imported = TranslationMemory()
+        self.assertEqual(imported.import_tsv(tsv_path, "en-hi"), 2)
+        self.assertEqual(imported.segments["en-hi"], memory.segments["en-hi"])
+
+
+if __name__ == "__main__":
+    unittest.main()
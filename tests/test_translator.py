@@ -0,0 +1,84 @@
+import importlib
+import unittest
+from unittest import mock
+import translator
+from translation_memory import TranslationMemory
+from utils import unload_model
+from utils.registry import is_loaded
+
+
+class TestTranslator(unittest.TestCase):
+    def test_import_loads_no_model(self):
+        unload_model("hi-en")
+        unload_model("en-hi")
+        importlib.reload(translator)
+        self.assertFalse(is_loaded("hi-en"))
+        self.assertFalse(is_loaded("en-hi"))
+
+        # Only the direction that is used gets loaded
+        self.assertIsInstance(translator.translate_english_to_hindi("How are you?"), str)
+        self.assertTrue(is_loaded("en-hi"))
+        self.assertFalse(is_loaded("hi-en"))
+
+    def test_warmup(self):
+        unload_model("hi-en")
+        translator.warmup("hi-en")
+        self.assertTrue(is_loaded("hi-en"))
+        with self.assertRaises(ValueError):
+            translator.warmup("en-fr")
+
+    def test_split_sentences(self):
+        text = "आप कैसे हैं? मैं ठीक हूँ। धन्यवाद\n\nNew paragraph. Second sentence"
+        self.assertEqual(
+            translator.split_sentences(text),
+            [["आप कैसे हैं?", "मैं ठीक हूँ।", "धन्यवाद"], [], ["New paragraph.", "Second sentence"]],
+        )
+
+    def test_documents_keep_layout(self):
+        sentences = ["How are you?", "The train leaves at seven.", "Please close the door."]
+        unbatched = [translator.translate_sentences([sentence], "en-hi")[0] for sentence in sentences]
+        self.assertEqual(translator.translate_sentences(sentences, "en-hi", batch_size=2), unbatched)
+
+        documents = ["How are you? The train leaves at seven.\n\nPlease close the door.", "How are you?"]
+        self.assertEqual(
+            translator.translate_documents(documents, "en-hi"),
+            [f"{unbatched[0]} {unbatched[1]}\n\n{unbatched[2]}", unbatched[0]],
+        )
+
+    def test_stream_matches_translation(self):
+        text = "How are you? The train leaves at seven.\nPlease close the door."
+        self.assertEqual("".join(translator.stream_english_to_hindi(text)), translator.translate_english_to_hindi(text))
+
+    def test_memory_sends_only_misses_to_model(self):
+        memory = TranslationMemory(fuzzy_threshold=None)
+        memory.add("How are you?", "stored", "en-hi")
+        sentences = ["How are you?", "Please close the door.", "Please close the door."]
+        with mock.patch.object(translator, "_translate_batched", wraps=translator._translate_batched) as batched:
+            result = translator.translate_sentences(sentences, "en-hi", memory=memory)
+        batched.assert_called_once()
+        self.assertEqual(batched.call_args[0][0], ["Please close the door."])
+        self.assertEqual(result[0], "stored")
+        self.assertEqual(result[1], result[2])
+        self.assertEqual(memory.lookup("Please close the door.", "en-hi")[0], result[1])
+
+    def test_segment_scripts(self):
+        self.assertEqual(
+            translator.segment_scripts("Hello, दुनिया! 5 books हैं।"),
+            [("en", "Hello, "), ("hi", "दुनिया! 5 "), ("en", "books "), ("hi", "हैं।")],
+        )
+        self.assertEqual(translator.segment_scripts("42 ..."), [(None, "42 ...")])
+
+    def test_mixed_routes_by_script(self):
+        unload_model("en-hi")
+        text = "Order id 42: आप कैसे हैं?\n\n17"
+        hindi = translator.translate_sentences(["आप कैसे हैं?"], "hi-en")[0]
+        self.assertEqual(translator.translate_mixed(text, target="en"), f"Order id 42: {hindi}\n\n17")
+        # Latin text was passed through, so en-hi was never needed
+        self.assertFalse(is_loaded("en-hi"))
+
+        english = translator.translate_sentences(["Order id 42:"], "en-hi")[0]
+        self.assertEqual(translator.translate_mixed(text), f"{english} {hindi}\n\n17")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+# translation_memory.py
+
+import sqlite3
+import unicodedata
+from collections import Counter, defaultdict
+
+
+def normalize(sentence):
+    return " ".join(unicodedata.normalize("NFC", sentence).split())
+
+
+def ngrams(text, n):
+    # Set of character n-grams; works for Latin and Devanagari alike
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+# Persistent translation memory backed by SQLite.
+#
+# Stored translations are looked up per direction ("en-hi" or "hi-en") by the
+# normalized source sentence. Without an exact match, the stored sentence with
+# the highest character n-gram similarity (Dice coefficient) is reused if it
+# reaches fuzzy_threshold; set fuzzy_threshold to None for exact matches only.
+# Candidates come from an in-memory inverted index from n-gram to sentence,
+# rebuilt from the database when the memory is opened.
+class TranslationMemory:
+    def __init__(self, path=":memory:", fuzzy_threshold=0.9, n=3):
+        self.path = path
+        self.fuzzy_threshold = fuzzy_threshold
+        self.n = n
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "direction TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL, PRIMARY KEY (direction, source))"
+        )
+        self.conn.commit()
+
+        # direction -> source -> target, direction -> n-gram -> sources and
+        # direction -> source -> number of n-grams
+        self.segments = defaultdict(dict)
+        self.index = defaultdict(lambda: defaultdict(set))
+        self.sizes = defaultdict(dict)
+        for direction, source, target in self.conn.execute("SELECT direction, source, target FROM segments"):
+            self._remember(direction, source, target)
+
+    def _remember(self, direction, source, target):
+        self.segments[direction][source] = target
+        grams = ngrams(source, self.n)
+        self.sizes[direction][source] = len(grams)
+        for gram in grams:
+            self.index[direction][gram].add(source)
+
+    def lookup(self, sentence, direction):
+        # (translation, similarity) of the best match, or None on a miss
+        source = normalize(sentence)
+        segments = self.segments[direction]
+        if source in segments:
+            self.exact_hits += 1
+            return segments[source], 1.0
+
+        match = self.fuzzy_match(source, direction) if self.fuzzy_threshold is not None else None
+        if match is None:
+            self.misses += 1
+            return None
+        self.fuzzy_hits += 1
+        return segments[match[0]], match[1]
+
+    def fuzzy_match(self, sentence, direction):
+        # (stored source, similarity) of the most similar stored sentence at or
+        # above fuzzy_threshold, or None
+        grams = ngrams(normalize(sentence), self.n)
+        index = self.index[direction]
+        sizes = self.sizes[direction]
+        shared = Counter()
+        for gram in grams:
+            shared.update(index.get(gram, ()))
+
+        # Dice can only reach the threshold if the n-gram counts are within
+        # a factor of (2 - threshold) / threshold of each other
+        low = len(grams) * self.fuzzy_threshold / (2 - self.fuzzy_threshold)
+        high = len(grams) * (2 - self.fuzzy_threshold) / self.fuzzy_threshold
+        best = None
+        for source, count in shared.items():
+            if not low <= sizes[source] <= high:
+                continue
+            score = 2 * count / (len(grams) + sizes[source])
+            if score >= self.fuzzy_threshold and (best is None or score > best[1]):
+                best = (source, score)
+        return best
+
+    def add(self, sentence, translation, direction):
+        self.add_many([(sentence, translation)], direction)
+
+    def add_many(self, pairs, direction):
+        rows = [(direction, normalize(source), normalize(target)) for source, target in pairs]
+        self.conn.executemany("INSERT OR REPLACE INTO segments (direction, source, target) VALUES (?, ?, ?)", rows)
+        self.conn.commit()
+        for _, source, target in rows:
+            self._remember(direction, source, target)
+
+    def import_tsv(self, path, direction):
+        # Add source<TAB>target lines; returns the number of pairs read
+        with open(path, encoding="utf-8") as f:
+            rows = [line.rstrip("\n").split("\t") for line in f]
+        pairs = [row[:2] for row in rows if len(row) >= 2]
+        self.add_many(pairs, direction)
+        return len(pairs)
+
+    def export_tsv(self, path, direction):
+        # Write every stored pair of direction as source<TAB>target lines;
+        # normalization already removed tabs and newlines from both sides
+        with open(path, "w", encoding="utf-8") as f:
+            for source, target in sorted(self.segments[direction].items()):
+                f.write(f"{source}\t{target}\n")
+        return len(self.segments[direction])
+
+    def stats(self):
+        lookups = self.exact_hits + self.fuzzy_hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "fuzzy_hits": self.fuzzy_hits,
+            "misses": self.misses,
+            "hit_rate": (self.exact_hits + self.fuzzy_hits) / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self.conn.close()
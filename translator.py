@@ -1,24 +1,220 @@
-from transformers import MarianMTModel, MarianTokenizer
+import re
 
-# Define models and tokenizers for Hindi-to-English and English-to-Hindi
-hi_to_en_model_name = "Helsinki-NLP/opus-mt-hi-en"
-en_to_hi_model_name = "Helsinki-NLP/opus-mt-en-hi"
+from translation_memory import normalize
+from utils import get_model
+from utils.batching import schedule_batches, split_long_sentence
+from utils.execution import PROFILES
+from utils.shortlist import shortlisted, special_ids
+from utils.streaming import stream_generate
 
-# Load tokenizers and models
-hi_to_en_tokenizer = MarianTokenizer.from_pretrained(hi_to_en_model_name)
-hi_to_en_model = MarianMTModel.from_pretrained(hi_to_en_model_name)
+# Translation directions, named like their models in the shared registry. Each
+# direction's tokenizer and model are loaded on its first use, so only the
+# directions that are actually used take time and memory
+DIRECTIONS = ("hi-en", "en-hi")
 
-en_to_hi_tokenizer = MarianTokenizer.from_pretrained(en_to_hi_model_name)
-en_to_hi_model = MarianMTModel.from_pretrained(en_to_hi_model_name)
+# Sentence ends in either script: Latin punctuation or the Devanagari danda
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?।])\s+")
+
+# Source script of each direction; the router sends Devanagari segments to
+# hi-en and Latin segments to en-hi
+SCRIPT_DIRECTIONS = {"hi": "hi-en", "en": "en-hi"}
+
+# Leading and trailing whitespace of a segment, kept around its translation
+SEGMENT_PADDING = re.compile(r"(\s*)(.*?)(\s*)$", re.S)
+
+# Optional utils.shortlist.LexicalShortlist per direction; when set, batched
+# translation only computes output logits for the batch's candidate tokens
+SHORTLISTS = {direction: None for direction in DIRECTIONS}
+
+# Sentences longer than this many tokens are split at clause boundaries
+# instead of being truncated by the tokenizer
+MAX_SENTENCE_TOKENS = 256
+
+def warmup(direction):
+    # Load the model of direction ahead of its first translation
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Unknown direction {direction!r}, expected one of {DIRECTIONS}")
+    get_model(direction)
+
+def split_sentences(text):
+    # Split text into lines and every line into sentences; empty lines are
+    # kept as empty lists so the paragraph layout can be rebuilt
+    return [SENTENCE_BOUNDARY.split(line.strip()) if line.strip() else [] for line in text.split("\n")]
+
+def char_script(ch):
+    # "hi" for Devanagari, "en" for Latin letters, None for digits,
+    # punctuation, whitespace and other scripts
+    if "\u0900" <= ch <= "\u097f" or "\ua8e0" <= ch <= "\ua8ff":
+        return "hi"
+    if ch.isalpha() and ch < "\u0250":
+        return "en"
+    return None
+
+def segment_scripts(text):
+    # Split text into (script, segment) runs of one script. Characters without
+    # a script stay with the run they follow (or the first run, at the start);
+    # text without any letters is one segment with script None
+    segments = []
+    script = None
+    start = 0
+    for i, ch in enumerate(text):
+        ch_script = char_script(ch)
+        if ch_script is None or ch_script == script:
+            continue
+        if script is not None:
+            segments.append((script, text[start:i]))
+            start = i
+        script = ch_script
+    if text:
+        segments.append((script, text[start:]))
+    return segments
+
+def translate_sentences(sentences, direction, batch_size=16, token_budget=2048, memory=None):
+    # Translate sentences in padded micro-batches of similar length; at most
+    # batch_size sentences and token_budget padded tokens go through generate
+    # at once. Returns the translations in input order. With a
+    # TranslationMemory, exact and fuzzy matches are reused and only the
+    # remaining sentences are translated (each once) and added to it
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Unknown direction {direction!r}, expected one of {DIRECTIONS}")
+    if memory is None:
+        return _translate_batched(sentences, direction, batch_size, token_budget)
+
+    translations = [memory.lookup(sentence, direction) for sentence in sentences]
+    translations = [None if match is None else match[0] for match in translations]
+    missing = {}
+    for sentence, translation in zip(sentences, translations):
+        if translation is None:
+            missing.setdefault(normalize(sentence), sentence)
+    if missing:
+        translated = dict(zip(missing, _translate_batched(list(missing.values()), direction, batch_size, token_budget)))
+        memory.add_many([(missing[key], translation) for key, translation in translated.items()], direction)
+        translations = [
+            translated[normalize(sentence)] if translation is None else translation
+            for sentence, translation in zip(sentences, translations)
+        ]
+    return translations
+
+def _translate_batched(sentences, direction, batch_size, token_budget):
+    tokenizer, model, device = get_model(direction)
+
+    segments = []
+    owners = []
+    for i, sentence in enumerate(sentences):
+        for piece in split_long_sentence(tokenizer, sentence, MAX_SENTENCE_TOKENS):
+            segments.append(piece)
+            owners.append(i)
+    if not segments:
+        return []
+
+    lengths = [len(ids) for ids in tokenizer(segments, truncation=False)["input_ids"]]
+    outputs = [None] * len(segments)
+    for batch in schedule_batches(lengths, token_budget, batch_size):
+        inputs = tokenizer(
+            [segments[i] for i in batch], truncation=True, padding="longest", return_tensors="pt"
+        ).to(device)
+        shortlist = SHORTLISTS[direction]
+        batch_model = model
+        if shortlist is not None:
+            batch_model = shortlisted(model, shortlist.candidates(inputs["input_ids"].cpu(), special_ids(tokenizer)))
+        with PROFILES[direction].apply(model):
+            translated = batch_model.generate(**inputs)
+        for i, text in zip(batch, tokenizer.batch_decode(translated, skip_special_tokens=True)):
+            outputs[i] = text
+
+    # Rejoin the pieces of split sentences
+    pieces = [[] for _ in sentences]
+    for owner, text in zip(owners, outputs):
+        pieces[owner].append(text)
+    return [" ".join(parts) for parts in pieces]
+
+def translate_documents(documents, direction, batch_size=16, token_budget=2048, memory=None):
+    # Translate a list of documents, batching the sentences of all of them
+    # together; every output keeps its document's line and paragraph breaks
+    layouts = [split_sentences(document) for document in documents]
+    sentences = [sentence for layout in layouts for line in layout for sentence in line]
+    translated = iter(translate_sentences(sentences, direction, batch_size, token_budget, memory))
+    return ["\n".join(" ".join(next(translated) for _ in line) for line in layout) for layout in layouts]
+
+def translate_mixed_documents(documents, target=None, batch_size=16, token_budget=2048, memory=None):
+    # Translate documents mixing Devanagari and Latin text. Every segment of
+    # one script goes to its direction (Devanagari hi-en, Latin en-hi); with
+    # target "en" or "hi", segments already in that language are passed
+    # through, as are segments without letters. The sentences of each
+    # direction are batched together across all documents, and a direction
+    # with nothing to translate never loads its model
+    if target not in (None, "en", "hi"):
+        raise ValueError(f"Unknown target language {target!r}, expected 'en', 'hi' or None")
+
+    queues = {direction: [] for direction in DIRECTIONS}
+    layouts = []
+    for document in documents:
+        layout = []
+        for line in document.split("\n"):
+            parts = []
+            for script, segment in segment_scripts(line):
+                direction = SCRIPT_DIRECTIONS.get(script)
+                if direction is None or script == target:
+                    parts.append(segment)
+                    continue
+                leading, body, trailing = SEGMENT_PADDING.match(segment).groups()
+                sentences = SENTENCE_BOUNDARY.split(body)
+                queues[direction].extend(sentences)
+                parts.append((leading, direction, len(sentences), trailing))
+            layout.append(parts)
+        layouts.append(layout)
+
+    translated = {
+        direction: iter(translate_sentences(sentences, direction, batch_size, token_budget, memory))
+        for direction, sentences in queues.items()
+        if sentences
+    }
+    outputs = []
+    for layout in layouts:
+        lines = []
+        for parts in layout:
+            line = ""
+            for part in parts:
+                if isinstance(part, str):
+                    line += part
+                else:
+                    leading, direction, count, trailing = part
+                    line += leading + " ".join(next(translated[direction]) for _ in range(count)) + trailing
+            lines.append(line)
+        outputs.append("\n".join(lines))
+    return outputs
+
+def translate_mixed(text, target=None, memory=None):
+    return translate_mixed_documents([text], target, memory=memory)[0]
 
 # Functions for translation
-def translate_hindi_to_english(sentence):
-    inputs = hi_to_en_tokenizer.encode(sentence, return_tensors="pt")
-    translated = hi_to_en_model.generate(inputs)
-    return hi_to_en_tokenizer.decode(translated[0], skip_special_tokens=True)
+def translate_hindi_to_english(text, memory=None):
+    return translate_documents([text], "hi-en", memory=memory)[0]
+
+def translate_english_to_hindi(text, memory=None):
+    return translate_documents([text], "en-hi", memory=memory)[0]
+
+# Streaming translation: yield the translation of text sentence by sentence,
+# or token by token with greedy=True (greedy decoding instead of the model's
+# default beam search)
+def _stream(text, direction, greedy):
+    tokenizer, model, device = get_model(direction)
+    for i, line in enumerate(split_sentences(text)):
+        if i:
+            yield "\n"
+        for j, sentence in enumerate(line):
+            if j:
+                yield " "
+            if greedy:
+                inputs = tokenizer(sentence, truncation=True, return_tensors="pt").to(device)
+                yield from stream_generate(
+                    model, tokenizer, inputs, PROFILES[direction], num_beams=1, do_sample=False
+                )
+            else:
+                yield translate_sentences([sentence], direction)[0]
 
-def translate_english_to_hindi(sentence):
-    inputs = en_to_hi_tokenizer.encode(sentence, return_tensors="pt")
-    translated = en_to_hi_model.generate(inputs)
-    return en_to_hi_tokenizer.decode(translated[0], skip_special_tokens=True)
+def stream_hindi_to_english(text, greedy=False):
+    return _stream(text, "hi-en", greedy)
 
+def stream_english_to_hindi(text, greedy=False):
+    return _stream(text, "en-hi", greedy)
@@ -1,2 +1,2 @@
 from .tokenizer import initialize_model
- 
+from .registry import get_model, model_id, model_stats, unload_model
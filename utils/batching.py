@@ -0,0 +1,70 @@
+import re
+
+# Clause boundaries an over-long sentence may be split at
+CLAUSE_BOUNDARY = re.compile(r"(?<=[,;:])\s+|\s+(?=(?:and|but|or|because|which|while|whereas)\s)")
+
+
+def token_length(tokenizer, text):
+    # Number of input ids including special tokens, without truncation
+    return len(tokenizer(text, truncation=False)["input_ids"])
+
+
+def split_long_sentence(tokenizer, sentence, max_tokens):
+    # Split a sentence into pieces of at most max_tokens tokens, preferring
+    # clause boundaries and falling back to word boundaries
+    if token_length(tokenizer, sentence) <= max_tokens:
+        return [sentence]
+
+    parts = [part for part in CLAUSE_BOUNDARY.split(sentence) if part]
+    if len(parts) == 1:
+        parts = sentence.split()
+        if len(parts) == 1:
+            # A single word longer than the limit is left to truncation
+            return [sentence]
+
+    pieces = []
+    current = ""
+    for part in parts:
+        candidate = f"{current} {part}" if current else part
+        if current and token_length(tokenizer, candidate) > max_tokens:
+            pieces.append(current)
+            current = part
+        else:
+            current = candidate
+    pieces.append(current)
+
+    # A clause can still be too long on its own; split it further on words
+    return [short for piece in pieces for short in split_long_sentence(tokenizer, piece, max_tokens)]
+
+
+def schedule_batches(lengths, token_budget, max_batch_size):
+    # Group segment indices into batches of similar length. Segments are sorted
+    # by token length and a batch is closed once its padded size
+    # (len(batch) * longest segment) would exceed token_budget
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches = []
+    current = []
+    for i in order:
+        longest = max(lengths[i], lengths[current[-1]]) if current else lengths[i]
+        if current and (len(current) == max_batch_size or (len(current) + 1) * longest > token_budget):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def padding_stats(lengths, batches):
+    # Real versus padded token counts for every batch
+    stats = []
+    for batch in batches:
+        real = sum(lengths[i] for i in batch)
+        padded = len(batch) * max(lengths[i] for i in batch)
+        stats.append({
+            "size": len(batch),
+            "real_tokens": real,
+            "padded_tokens": padded,
+            "padding_waste": (padded - real) / padded if padded else 0.0,
+        })
+    return stats
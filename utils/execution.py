@@ -0,0 +1,129 @@
+import os
+import time
+import warnings
+import weakref
+from contextlib import contextmanager, nullcontext
+
+import torch
+
+
+def bf16_supported():
+    # True on CPUs with native bf16 matrix instructions (AVX512-BF16 or AMX)
+    try:
+        with open("/proc/cpuinfo") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+# Models known to contain dynamically quantized (int8) layers, by model
+_quantized_models = weakref.WeakKeyDictionary()
+
+
+def is_dynamically_quantized(model):
+    # True for torch models with int8 dynamic Linear layers; their kernels only
+    # take float32 input, so they can not run under bf16 autocast
+    if not isinstance(model, torch.nn.Module):
+        return False
+    if model not in _quantized_models:
+        _quantized_models[model] = any(
+            isinstance(module, torch.ao.nn.quantized.dynamic.Linear) for module in model.modules()
+        )
+    return _quantized_models[model]
+
+
+class ExecutionProfile:
+    # How model calls of one engine run on CPU: without autograd, with
+    # intra_op_threads / inter_op_threads PyTorch threads (None keeps the
+    # defaults) and optionally under bf16 autocast.
+    #
+    # Intra-op threads are process-wide in PyTorch, so they are set for the
+    # duration of each call and restored afterwards; engines that run
+    # concurrently in one process should share a thread count. Inter-op threads
+    # can only be set once per process, before any parallel work; a later
+    # request is ignored with a warning.
+    #
+    # ONNX Runtime sessions do not use PyTorch threads: the registry passes the
+    # profile's thread counts to the session when it loads an ONNX model, and
+    # later changes to the profile do not reach that session.
+    def __init__(self, intra_op_threads=None, inter_op_threads=None, bf16=False, inference_mode=True):
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        # Only enable autocast where the CPU runs bf16 natively
+        self.bf16 = bf16 and bf16_supported()
+        self.inference_mode = inference_mode
+
+    @contextmanager
+    def apply(self, model=None):
+        # Pass the model that runs inside the block, so bf16 autocast is left
+        # off for int8 models
+        if self.inter_op_threads is not None and torch.get_num_interop_threads() != self.inter_op_threads:
+            try:
+                torch.set_num_interop_threads(self.inter_op_threads)
+            except RuntimeError:
+                warnings.warn(
+                    f"inter_op_threads={self.inter_op_threads} ignored: PyTorch inter-op threads are already "
+                    f"fixed at {torch.get_num_interop_threads()} in this process",
+                    RuntimeWarning,
+                )
+        bf16 = self.bf16 and not is_dynamically_quantized(model)
+
+        previous_threads = torch.get_num_threads()
+        if self.intra_op_threads is not None:
+            torch.set_num_threads(self.intra_op_threads)
+        try:
+            with torch.inference_mode() if self.inference_mode else nullcontext():
+                with torch.autocast("cpu", dtype=torch.bfloat16) if bf16 else nullcontext():
+                    yield
+        finally:
+            if self.intra_op_threads is not None:
+                torch.set_num_threads(previous_threads)
+
+    def describe(self):
+        return {
+            "intra_op_threads": self.intra_op_threads,
+            "inter_op_threads": self.inter_op_threads,
+            # What PyTorch actually uses, which differs if the request came too late
+            "inter_op_threads_effective": torch.get_num_interop_threads(),
+            "bf16": self.bf16,
+            "inference_mode": self.inference_mode,
+        }
+
+
+def _env_threads(name):
+    value = os.environ.get("NLP_" + name.upper().replace("-", "_") + "_THREADS")
+    return int(value) if value else None
+
+
+# Profile applied to every model call of each engine. Thread counts can be set
+# with NLP_PARAPHRASE_THREADS, NLP_EN_HI_THREADS and NLP_HI_EN_THREADS, and bf16
+# autocast with NLP_BF16=1; or assign a new ExecutionProfile here
+PROFILES = {
+    name: ExecutionProfile(_env_threads(name), bf16=os.environ.get("NLP_BF16") == "1")
+    for name in ("paraphrase", "en-hi", "hi-en")
+}
+
+
+def compare_profiles(engine, run, profiles, repeats=3):
+    # Time run() under each named profile for engine and report latency,
+    # throughput and speedup relative to the first profile
+    original = PROFILES[engine]
+    report = {}
+    try:
+        for name, profile in profiles.items():
+            PROFILES[engine] = profile
+            # Warm-up call, so one-off setup does not count against a profile
+            run()
+            start = time.perf_counter()
+            for _ in range(repeats):
+                run()
+            latency = (time.perf_counter() - start) / repeats
+            report[name] = dict(profile.describe(), seconds_per_call=latency, calls_per_second=1 / latency)
+    finally:
+        PROFILES[engine] = original
+
+    baseline = next(iter(report.values()))["seconds_per_call"] if report else None
+    for stats in report.values():
+        stats["speedup"] = baseline / stats["seconds_per_call"]
+    return report
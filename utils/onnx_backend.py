@@ -0,0 +1,105 @@
+import os
+import shutil
+import time
+
+import transformers
+
+# Exported ONNX graphs are kept here so each model is only exported once
+ONNX_CACHE_DIR = os.environ.get(
+    "NLP_ONNX_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "nlp_project", "onnx")
+)
+
+
+def _ort_model_class():
+    # optimum is only needed for the ONNX backend
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise ImportError(
+            "The onnx backend needs optimum with ONNX Runtime: pip install 'optimum[onnxruntime]'"
+        ) from e
+    return ORTModelForSeq2SeqLM
+
+
+def onnx_cache_path(model_name):
+    return os.path.join(ONNX_CACHE_DIR, f"{model_name.replace('/', '--')}-transformers{transformers.__version__}")
+
+
+def session_options(profile):
+    # ONNX Runtime session options with the thread counts of an
+    # ExecutionProfile; None keeps the ONNX Runtime defaults
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    if profile is not None and profile.intra_op_threads is not None:
+        options.intra_op_num_threads = profile.intra_op_threads
+    if profile is not None and profile.inter_op_threads is not None:
+        options.inter_op_num_threads = profile.inter_op_threads
+    return options
+
+
+def load_onnx(model_name, profile=None):
+    # Load the encoder, decoder and decoder-with-past graphs of model_name on
+    # the ONNX Runtime CPU provider, exporting them on first use. The model
+    # keeps the transformers generate() API, so greedy and beam search run
+    # unchanged with past key values cached between decoding steps. The
+    # sessions use the thread counts of profile (an ExecutionProfile)
+    ort_model_class = _ort_model_class()
+    options = session_options(profile)
+    path = onnx_cache_path(model_name)
+    if os.path.exists(os.path.join(path, "config.json")):
+        return ort_model_class.from_pretrained(
+            path, use_cache=True, provider="CPUExecutionProvider", session_options=options
+        )
+
+    model = ort_model_class.from_pretrained(
+        model_name, export=True, use_cache=True, provider="CPUExecutionProvider", session_options=options
+    )
+    # Export into a temporary directory and rename it, so a concurrent loader
+    # never sees a half-written export
+    tmp_path = path + f".tmp{os.getpid()}"
+    model.save_pretrained(tmp_path)
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        # Another process finished the same export first
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    return model
+
+
+def onnx_model_bytes(model_name):
+    # Size of the exported graphs and weights on disk
+    path = onnx_cache_path(model_name)
+    return sum(
+        os.path.getsize(os.path.join(root, file_name)) for root, _, files in os.walk(path) for file_name in files
+    )
+
+
+def parity_check(name, sentences=None, beam_widths=(1, 4), max_new_tokens=60):
+    # Generate with the PyTorch and the ONNX Runtime model for every beam width
+    # and report how often their outputs agree and the throughput of both
+    from .quantization import REGRESSION_SENTENCES
+    from .registry import get_model
+
+    sentences = sentences or REGRESSION_SENTENCES[name]
+    report = {}
+    for num_beams in beam_widths:
+        outputs = {}
+        result = {}
+        for backend in ("torch", "onnx"):
+            tokenizer, model, device = get_model(name, False, backend)
+            batch = tokenizer(sentences, padding="longest", return_tensors="pt").to(device)
+
+            start = time.perf_counter()
+            generated = model.generate(**batch, num_beams=num_beams, max_new_tokens=max_new_tokens)
+            seconds = time.perf_counter() - start
+
+            outputs[backend] = tokenizer.batch_decode(generated, skip_special_tokens=True)
+            result[backend + "_sentences_per_second"] = len(sentences) / seconds
+
+        result["exact_match"] = sum(a == b for a, b in zip(outputs["torch"], outputs["onnx"])) / len(sentences)
+        result["mismatches"] = [
+            {"torch": a, "onnx": b} for a, b in zip(outputs["torch"], outputs["onnx"]) if a != b
+        ]
+        report["greedy" if num_beams == 1 else f"beam{num_beams}"] = result
+    return report
@@ -0,0 +1,130 @@
+import io
+import os
+import tempfile
+import time
+
+import torch
+import transformers
+from transformers import GenerationConfig
+
+# State dicts of quantized models are kept here so quantization only runs once
+QUANTIZED_CACHE_DIR = os.environ.get(
+    "NLP_QUANTIZED_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "nlp_project", "quantized")
+)
+
+# Fixed sentences the regression check compares fp32 and int8 output on
+REGRESSION_SENTENCES = {
+    "paraphrase": [
+        "The weather is nice today.",
+        "He decided to take the train instead of driving to work.",
+        "The committee will announce its decision next week.",
+        "Reading books every day improves your vocabulary.",
+    ],
+    "en-hi": [
+        "How are you?",
+        "The train leaves at seven in the morning.",
+        "Please close the door when you leave.",
+        "India is a large country with many languages.",
+    ],
+    "hi-en": [
+        "आप कैसे हैं?",
+        "ट्रेन सुबह सात बजे निकलती है।",
+        "कृपया जाते समय दरवाज़ा बंद कर दें।",
+        "भारत कई भाषाओं वाला एक बड़ा देश है।",
+    ],
+}
+
+
+def quantize(model):
+    # int8 dynamic quantization of every Linear layer; activations stay float
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def quantized_cache_path(model_name):
+    # The packed int8 layout is only valid for the torch/transformers versions
+    # that wrote it
+    file_name = (
+        f"{model_name.replace('/', '--')}-torch{torch.__version__}-transformers{transformers.__version__}-state.pt"
+    )
+    return os.path.join(QUANTIZED_CACHE_DIR, file_name)
+
+
+def _quantized_model(model_name, model_class, state_dict=None):
+    # int8 model of model_name; with state_dict, the quantized architecture is
+    # built from the config and the saved int8 weights are loaded into it
+    if state_dict is None:
+        return quantize(model_class.from_pretrained(model_name))
+
+    model = quantize(model_class(model_class.config_class.from_pretrained(model_name)))
+    model.load_state_dict(state_dict)
+    try:
+        model.generation_config = GenerationConfig.from_pretrained(model_name)
+    except OSError:
+        # Models without a generation_config.json keep the one from the config
+        pass
+    return model.eval()
+
+
+def load_quantized(model_name, model_class):
+    # Load the int8 model from the disk cache, quantizing and caching it the
+    # first time. Only the state dict is cached and it is loaded with
+    # weights_only=True, so a cache file can not run code
+    path = quantized_cache_path(model_name)
+    if os.path.exists(path):
+        try:
+            return _quantized_model(model_name, model_class, torch.load(path, weights_only=True))
+        except Exception:
+            # Corrupt, foreign or outdated cache file; quantize again
+            os.remove(path)
+
+    model = _quantized_model(model_name, model_class)
+    os.makedirs(QUANTIZED_CACHE_DIR, exist_ok=True)
+    # Write to a temporary file of this process first so a concurrent reader
+    # never sees a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=QUANTIZED_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            torch.save(model.state_dict(), f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return model
+
+
+def serialized_size(model):
+    # Bytes of the saved state dict; counts int8 packed weights, which
+    # model.parameters() does not list
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def regression_check(name, sentences=None, max_new_tokens=60):
+    # Generate with the fp32 and the int8 model on the same sentences and
+    # report agreement, latency and parameter memory of both
+    from paraphraser.decoding import unigram_f1
+    from .registry import get_model
+
+    sentences = sentences or REGRESSION_SENTENCES[name]
+    report = {}
+    outputs = {}
+    for quantized in (False, True):
+        tokenizer, model, device = get_model(name, quantized)
+        batch = tokenizer(sentences, padding="longest", return_tensors="pt").to(device)
+
+        start = time.perf_counter()
+        with torch.no_grad():
+            generated = model.generate(**batch, max_new_tokens=max_new_tokens)
+        seconds = time.perf_counter() - start
+
+        outputs[quantized] = tokenizer.batch_decode(generated, skip_special_tokens=True)
+        report["int8" if quantized else "fp32"] = {
+            "seconds": seconds,
+            "state_dict_bytes": serialized_size(model),
+        }
+
+    report["exact_match"] = sum(a == b for a, b in zip(outputs[False], outputs[True])) / len(sentences)
+    report["unigram_f1"] = sum(map(unigram_f1, outputs[True], outputs[False])) / len(sentences)
+    report["outputs"] = [{"fp32": a, "int8": b} for a, b in zip(outputs[False], outputs[True])]
+    return report
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+
+import torch
+from transformers import MarianMTModel, MarianTokenizer, PegasusForConditionalGeneration, PegasusTokenizer
+
+from .execution import PROFILES
+from .onnx_backend import load_onnx, onnx_model_bytes
+from .quantization import load_quantized, serialized_size
+
+# Set NLP_QUANTIZE=1 to load int8 dynamically quantized CPU models by default
+QUANTIZE_BY_DEFAULT = os.environ.get("NLP_QUANTIZE") == "1"
+
+# Models known to the registry: name -> (pretrained id, tokenizer class, model class)
+MODELS = {
+    "paraphrase": ("tuner007/pegasus_paraphrase", PegasusTokenizer, PegasusForConditionalGeneration),
+    "en-hi": ("Helsinki-NLP/opus-mt-en-hi", MarianTokenizer, MarianMTModel),
+    "hi-en": ("Helsinki-NLP/opus-mt-hi-en", MarianTokenizer, MarianMTModel),
+}
+
+# Inference backend per engine, "torch" or "onnx" (ONNX Runtime on CPU, see
+# utils.onnx_backend). Set with NLP_PARAPHRASE_BACKEND, NLP_EN_HI_BACKEND and
+# NLP_HI_EN_BACKEND, or by assigning to this dict before the model is loaded
+BACKENDS = {
+    name: os.environ.get("NLP_" + name.upper().replace("-", "_") + "_BACKEND", "torch") for name in MODELS
+}
+
+# Loaded models are shared by every caller in the process:
+# (name, quantized, backend) -> (tokenizer, model, device)
+_loaded = {}
+# Load time and memory of every model loaded so far, by the same key
+_stats = {}
+# One lock per model, so loading one model does not block the others
+_locks = {name: threading.Lock() for name in MODELS}
+
+
+def _rss_bytes():
+    # Resident set size of this process, or None where /proc is unavailable
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def resolve_variant(name, quantized=None, backend=None):
+    # Fill in the process defaults for quantized and backend
+    if name not in MODELS:
+        raise KeyError(f"Unknown model {name!r}, expected one of {sorted(MODELS)}")
+    if backend is None:
+        backend = BACKENDS[name]
+    if backend not in ("torch", "onnx"):
+        raise ValueError(f"Unknown backend {backend!r}, expected 'torch' or 'onnx'")
+    if quantized is None:
+        quantized = QUANTIZE_BY_DEFAULT and backend == "torch"
+    if quantized and backend != "torch":
+        raise ValueError("int8 dynamic quantization is only available with the torch backend")
+    return quantized, backend
+
+
+def model_id(name, quantized=None, backend=None):
+    # Pretrained id plus the variant, e.g. "Helsinki-NLP/opus-mt-en-hi+onnx"
+    quantized, backend = resolve_variant(name, quantized, backend)
+    suffix = "+int8" if quantized else "+onnx" if backend == "onnx" else ""
+    return MODELS[name][0] + suffix
+
+
+def get_model(name, quantized=None, backend=None):
+    # Return the shared (tokenizer, model, device) for name, loading it on first
+    # use. quantized=True gives the int8 CPU model (see utils.quantization) and
+    # backend="onnx" the ONNX Runtime model; None follows QUANTIZE_BY_DEFAULT
+    # and BACKENDS
+    quantized, backend = resolve_variant(name, quantized, backend)
+    key = (name, quantized, backend)
+
+    loaded = _loaded.get(key)
+    if loaded is not None:
+        return loaded
+
+    with _locks[name]:
+        # Another thread may have finished loading while we waited
+        if key in _loaded:
+            return _loaded[key]
+
+        model_name, tokenizer_class, model_class = MODELS[name]
+        # Dynamic quantization and the ONNX backend only run on CPU
+        device = "cuda" if torch.cuda.is_available() and not quantized and backend == "torch" else "cpu"
+
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        tokenizer = tokenizer_class.from_pretrained(model_name)
+        if backend == "onnx":
+            # ONNX Runtime takes its thread counts when the session is created
+            model = load_onnx(model_name, PROFILES[name])
+            parameter_bytes = onnx_model_bytes(model_name)
+        elif quantized:
+            model = load_quantized(model_name, model_class)
+            parameter_bytes = serialized_size(model)
+        else:
+            model = model_class.from_pretrained(model_name).to(device)
+            parameter_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+        load_seconds = time.perf_counter() - start
+        rss_after = _rss_bytes()
+
+        _stats[key] = {
+            "model_name": model_name,
+            "quantized": quantized,
+            "backend": backend,
+            "device": device,
+            "load_seconds": load_seconds,
+            "parameter_bytes": parameter_bytes,
+            "rss_delta_bytes": None if rss_before is None else rss_after - rss_before,
+        }
+        _loaded[key] = (tokenizer, model, device)
+        return _loaded[key]
+
+
+def unload_model(name, quantized=None, backend=None):
+    # Drop the registry's references to every loaded variant of name (or only
+    # the ones matching quantized / backend); memory is freed once callers drop
+    # theirs too
+    with _locks[name]:
+        for key in list(_loaded):
+            if key[0] != name:
+                continue
+            if quantized is not None and key[1] != quantized:
+                continue
+            if backend is not None and key[2] != backend:
+                continue
+            del _loaded[key]
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def is_loaded(name, quantized=None, backend=None):
+    return (name,) + resolve_variant(name, quantized, backend) in _loaded
+
+
+def model_stats():
+    # Stats keyed by model name, with an "-int8" or "-onnx" suffix for those
+    # variants
+    return {
+        name + ("-int8" if quantized else "-onnx" if backend == "onnx" else ""): dict(stats)
+        for (name, quantized, backend), stats in _stats.items()
+    }
@@ -0,0 +1,165 @@
+import copy
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+import torch
+
+
+class LexicalShortlist:
+    # Lexical table for output vocabulary shortlisting: for every source token
+    # id, the target token ids most likely to appear in its translation, plus
+    # a list of frequent target ids that are always allowed. The table is kept
+    # CSR-style: the candidates of sources[i] are targets[offsets[i]:offsets[i + 1]]
+    def __init__(self, sources, offsets, targets, common):
+        self.sources = np.asarray(sources, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int64)
+        self.common = np.asarray(common, dtype=np.int64)
+        self._rows = {int(source): i for i, source in enumerate(self.sources)}
+
+    @classmethod
+    def from_pairs(cls, tokenizer, pairs, top_k=50, common_size=500):
+        # Build the table from (source, target) sentence pairs, e.g. hindencorp
+        # or source sentences with the full model's own translations. Each
+        # source token keeps the top_k target tokens by P(target | source) of
+        # appearing in the same pair
+        cooccurrence = defaultdict(Counter)
+        source_counts = Counter()
+        target_counts = Counter()
+        for source, target in pairs:
+            source_ids = set(tokenizer(source)["input_ids"])
+            target_ids = set(tokenizer(text_target=target)["input_ids"])
+            source_counts.update(source_ids)
+            target_counts.update(target_ids)
+            for source_id in source_ids:
+                cooccurrence[source_id].update(target_ids)
+
+        sources = sorted(cooccurrence)
+        offsets = [0]
+        targets = []
+        for source_id in sources:
+            best = sorted(
+                cooccurrence[source_id].items(), key=lambda item: (-item[1] / source_counts[source_id], item[0])
+            )[:top_k]
+            targets.extend(target_id for target_id, _ in best)
+            offsets.append(len(targets))
+        common = [target_id for target_id, _ in target_counts.most_common(common_size)]
+        return cls(sources, offsets, targets, common)
+
+    @classmethod
+    def from_model(cls, name, sentences, top_k=50, common_size=500, batch_size=16):
+        # Build the table from the alignments the full model itself produces:
+        # source sentences paired with their unshortlisted translations
+        from .registry import get_model
+
+        tokenizer, model, device = get_model(name)
+        pairs = []
+        for i in range(0, len(sentences), batch_size):
+            batch = sentences[i:i + batch_size]
+            inputs = tokenizer(batch, truncation=True, padding="longest", return_tensors="pt").to(device)
+            with torch.inference_mode():
+                generated = model.generate(**inputs)
+            pairs.extend(zip(batch, tokenizer.batch_decode(generated, skip_special_tokens=True)))
+        return cls.from_pairs(tokenizer, pairs, top_k, common_size)
+
+    @classmethod
+    def from_hindencorp(cls, tokenizer, path, direction, top_k=50, common_size=500):
+        # Build the table from the training split of hindencorp05.plaintext
+        from hindencorp import HindEnCorp
+
+        return cls.from_pairs(tokenizer, HindEnCorp(path).pairs(direction, "train"), top_k, common_size)
+
+    def save(self, path):
+        np.savez(path, sources=self.sources, offsets=self.offsets, targets=self.targets, common=self.common)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["sources"], data["offsets"], data["targets"], data["common"])
+
+    def candidates(self, input_ids, extra_ids=()):
+        # Sorted target ids allowed for a batch of source token ids, plus
+        # extra_ids (e.g. end of sentence)
+        parts = [self.common, np.asarray(extra_ids, dtype=np.int64)]
+        for source_id in np.unique(np.asarray(input_ids)):
+            row = self._rows.get(int(source_id))
+            if row is not None:
+                parts.append(self.targets[self.offsets[row]:self.offsets[row + 1]])
+        return np.unique(np.concatenate(parts))
+
+
+class ShortlistHead(torch.nn.Module):
+    # Output projection restricted to candidate_ids. Logits of every other
+    # token are -inf, so generate keeps working with full-vocabulary ids. The
+    # selected rows are a plain tensor, detached from the model's weight
+    def __init__(self, weight, candidate_ids, vocab_size):
+        super().__init__()
+        self.candidate_ids = torch.as_tensor(candidate_ids, device=weight.device)
+        with torch.no_grad():
+            self.weight = weight.index_select(0, self.candidate_ids)
+        self.vocab_size = vocab_size
+
+    def forward(self, hidden):
+        logits = hidden @ self.weight.to(hidden.dtype).T
+        full = logits.new_full(hidden.shape[:-1] + (self.vocab_size,), float("-inf"))
+        full[..., self.candidate_ids] = logits
+        return full
+
+
+def _head_weight(head):
+    # Float weight of a Linear or a dynamically quantized Linear
+    with torch.no_grad():
+        weight = head.weight() if callable(head.weight) else head.weight
+        return weight.dequantize() if weight.is_quantized else weight
+
+
+def shortlisted(model, candidate_ids):
+    # Shallow copy of model whose output projection is restricted to
+    # candidate_ids. The copy shares every parameter with model but has its own
+    # submodule table, so the shared registry model is never changed and
+    # concurrent calls on it are unaffected. Only torch models can be
+    # shortlisted
+    if not hasattr(model, "lm_head"):
+        raise ValueError("Vocabulary shortlisting needs a torch model with an lm_head")
+    head = ShortlistHead(_head_weight(model.lm_head), candidate_ids, model.config.vocab_size)
+    clone = copy.copy(model)
+    clone._modules = dict(model._modules)
+    clone.lm_head = head
+    return clone
+
+
+def special_ids(tokenizer):
+    return [i for i in (tokenizer.eos_token_id, tokenizer.pad_token_id, tokenizer.unk_token_id) if i is not None]
+
+
+def parity_check(name, shortlist, sentences=None):
+    # Translate sentences with the full and the shortlisted output projection
+    # and report how often the outputs differ, the share of the vocabulary the
+    # shortlist kept and the time of both
+    from .quantization import REGRESSION_SENTENCES
+    from .registry import get_model
+
+    sentences = sentences or REGRESSION_SENTENCES[name]
+    tokenizer, model, device = get_model(name)
+    batch = tokenizer(sentences, truncation=True, padding="longest", return_tensors="pt").to(device)
+    candidate_ids = shortlist.candidates(batch["input_ids"].cpu(), special_ids(tokenizer))
+
+    outputs = {}
+    report = {}
+    for mode in ("full", "shortlist"):
+        start = time.perf_counter()
+        with torch.inference_mode():
+            if mode == "full":
+                generated = model.generate(**batch)
+            else:
+                generated = shortlisted(model, candidate_ids).generate(**batch)
+        report[mode + "_seconds"] = time.perf_counter() - start
+        outputs[mode] = tokenizer.batch_decode(generated, skip_special_tokens=True)
+
+    report["shortlist_fraction"] = len(candidate_ids) / model.config.vocab_size
+    report["differ_rate"] = sum(a != b for a, b in zip(outputs["full"], outputs["shortlist"])) / len(sentences)
+    report["mismatches"] = [
+        {"full": a, "shortlist": b} for a, b in zip(outputs["full"], outputs["shortlist"]) if a != b
+    ]
+    return report
@@ -0,0 +1,48 @@
+import threading
+
+import torch
+from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+
+class _StopFlag(StoppingCriteria):
+    # Stops generate once the event is set
+    def __init__(self, event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return torch.full((input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device)
+
+
+def stream_generate(model, tokenizer, inputs, profile, **generate_kwargs):
+    # Run generate for a single input in a background thread and yield decoded
+    # text as tokens arrive. Token streaming needs greedy or sampled decoding
+    # (num_beams=1). The profile is applied inside the thread, because inference
+    # mode is thread-local. Closing the generator early stops generate after
+    # the current step
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    stop = threading.Event()
+    errors = []
+
+    def run():
+        try:
+            with profile.apply(model):
+                model.generate(
+                    **inputs, streamer=streamer, stopping_criteria=StoppingCriteriaList([_StopFlag(stop)]),
+                    **generate_kwargs,
+                )
+        except BaseException as e:
+            errors.append(e)
+            # Unblock the consumer
+            streamer.end()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        for text in streamer:
+            if text:
+                yield text
+    finally:
+        stop.set()
+        thread.join()
+    if errors:
+        raise errors[0]
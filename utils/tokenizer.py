@@ -1,10 +1,6 @@
- 
-import torch
-from transformers import PegasusForConditionalGeneration, PegasusTokenizer
+from .registry import get_model
 
-def initialize_model():
-    model_name = "tuner007/pegasus_paraphrase"
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-    tokenizer = PegasusTokenizer.from_pretrained(model_name)
-    model = PegasusForConditionalGeneration.from_pretrained(model_name).to(device)
-    return tokenizer, model, device
+def initialize_model(quantized=None, backend=None):
+    # The Pegasus paraphrase model is loaded once per process and shared by
+    # every Paraphraser
+    return get_model("paraphrase", quantized, backend)